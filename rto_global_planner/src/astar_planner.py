@@ -2,7 +2,11 @@
 
 import rospy
 import numpy as np
+import heapq
 import tf
+import time
+
+from math import sqrt
 
 from std_msgs.msg import String
 from geometry_msgs.msg import Twist, Point, Quaternion, Pose, PoseStamped, PoseWithCovarianceStamped
@@ -10,174 +14,137 @@ from sensor_msgs.msg import LaserScan
 from nav_msgs.msg import OccupancyGrid, MapMetaData, Path
 from visualization_msgs.msg import Marker
 
+from plan_cache import Plan_Cache
+
 #TODO:make it can publish command to cmd_vel
 #TODO:fit to different maps
-#TODO:speed up search
 #TODO:consider the point is valid but cannot be reached
 #TODO:add threading
 #TODO:use initial position from amcl node
 
-class Node():
-    """
-    A node class for A* Pathfinding
-    @parameter parent: parent node
-    @parameter position: position on map
-    @parameter g: cost from start position to current position
-    @parameter h: heuristic cost from current position to goal
-    @parameter f: sum of g and h
-    """
-
-    def __init__(self, parent=None, position=None):
-        self.parent = parent
-        self.position = position
-
-        self.g = 0
-        self.h = 0
-        self.f = 0
-
-    def __eq__(self, other):
-        return self.position == other.position
-
 class Astar_Planner():
     """
     Independent Astar_Planner function class
+
+    The open list is a binary heap ordered by (f, insertion order). The g values, closed flags and
+    parents are kept in flat arrays indexed by cell (index = x * map_height + y), so membership
+    tests and the goal check are O(1). A node keeps the f value it was inserted with when a shorter
+    way to it is found later (only g and parent are updated), which is exactly how the list based
+    search behaved, so both return the same paths.
+    @parameter expanded_nodes: number of nodes expanded by the last search
     """
 
-    def getMinNode(self):
-        """
-        try to find the node with minimal f in openlist
+    # 8-connected neighbourhood (offset in x, offset in y, action cost)
+    steps = ((0, 1, 1.0), (1, 0, 1.0), (0, -1, 1.0), (-1, 0, 1.0),
+             (1, 1, sqrt(2)), (1, -1, sqrt(2)), (-1, 1, sqrt(2)), (-1, -1, sqrt(2)))
 
-        @return: the node with minimal f value
-        """
-        currentNode = self.open_list[0]
-        for node in self.open_list:
-            # if node.g + node.h < currentNode.g + currentNode.h:
-            if node.f < currentNode.f:
-                currentNode = node
-        return currentNode
-
-    def pointInCloseList(self, position):
-        """
-        determine if a position is in closelist
-        """
-        for node in self.closed_list:
-            if node.position == position:
-                return True
-        return False
+    def __init__(self):
+        self.expanded_nodes = 0
 
-    def pointInOpenList(self, position):
+    def heuristic(self, x, y):
         """
-        determine if a position is in openlist
+        @return: h value of the cell (x, y)
         """
-        for node in self.open_list:
-            if node.position == position:
-                return node
-        return None
-
-    def endPointInCloseList(self):
-        """
-        determine if goal is already in closelist
+        dx = abs(x - self.end[0])
+        dy = abs(y - self.end[1])
+        # closed-form distance
+        # return dx + dy + (sqrt(2) - 2) * min(dx, dy) + self.cost[x * self.map_height + y]
+        # euclidean distance
+        # return dx + dy + self.cost[x * self.map_height + y]
+        # real distance
+        return sqrt(dx * dx + dy * dy) + self.cost[x * self.map_height + y]
+
+    def search(self, minF):
         """
-        for node in self.closed_list:
-            if node.position == self.endnode.position:
-                return node
-        return None
+        search action for next step in 8 directions and add the nodes to openlist
 
-    def search(self, minF, offsetX, offsetY):
-        """
-        search action for next step and add this node to openlist
+        @parameter minF: cell index of the expanded node
         """
+        map_width = self.map_width
+        map_height = self.map_height
+        g, parent, order, closed = self.g, self.parent, self.order, self.closed
+        x, y = divmod(minF, map_height)
 
-        node_pos = (minF.position[0] + offsetX, minF.position[1] + offsetY)
+        for offsetX, offsetY, action_cost in self.steps:
+            node_x = x + offsetX
+            node_y = y + offsetY
 
-        # if the offset is out of boundary
-        if node_pos[0] > self.map_width - 1 or node_pos[0] < 0 or node_pos[1] > self.map_height - 1 or node_pos[1] < 0:
-            return
+            # if the offset is out of boundary
+            if node_x > map_width - 1 or node_x < 0 or node_y > map_height - 1 or node_y < 0:
+                continue
 
-        # if the offset is valid
-        # elif self.map[int(node_pos[0])][int(node_pos[1])] != 0:
-        #     return
+            # if the node is in closed set, then pass
+            node = node_x * map_height + node_y
+            if closed[node]:
+                continue
 
-        # if the node is in closed set, then pass
-        elif self.pointInCloseList(node_pos):
-            return
+            node_g = g[minF] + action_cost
 
-        else:
             # if it is not in openlist, add it to openlist
-            currentNode = self.pointInOpenList(node_pos)
-            if not currentNode:
-                currentNode = Node(minF, node_pos)
-                currentNode.g = minF.g + np.sqrt(offsetX * offsetX + offsetY * offsetY)
-                dx = abs(node_pos[0] - self.endnode.position[0])
-                dy = abs(node_pos[1] - self.endnode.position[1])
-                # closed-form distance
-                # currentNode.h =  dx + dy + (np.sqrt(2) - 2) * min(dx, dy) + self.map[node_pos[0]][node_pos[1]]
-                # euclidean distance
-                # currentNode.h =  dx + dy + self.map[node_pos[0]][node_pos[1]]
-                # real distance
-                currentNode.h =  np.sqrt(dx * dx + dy * dy) + self.map[node_pos[0]][node_pos[1]]
-                currentNode.f = currentNode.g + currentNode.h
-                self.open_list.append(currentNode)
-                return
+            if order[node] < 0:
+                g[node] = node_g
+                parent[node] = minF
+                order[node] = self.counter
+                self.counter += 1
+                heapq.heappush(self.open_list, (node_g + self.heuristic(node_x, node_y), order[node], node))
+
             # if it is in openlist, determine if g of currentnode is smaller
-            else:
-                action_cost = np.sqrt(offsetX * offsetX + offsetY * offsetY)
-                if minF.g + action_cost < currentNode.g:
-                    currentNode.g = minF.g + action_cost
-                    currentNode.parent = minF
-                    return
+            elif node_g < g[node]:
+                g[node] = node_g
+                parent[node] = minF
 
     def astar(self, gridmap, map_width, map_height, start, end):
         """
         main function of astar search
 
-        @return: a global path
+        @return: a global path, empty if the goal cannot be reached
         """
 
-        # Initialize endnode and startnode
-        self.startnode = Node(None, start)
-        self.startnode.g = self.startnode.h = self.startnode.f = 0
-        self.endnode = Node(None, end)
-        self.endnode.g = self.endnode.h = self.endnode.f = 0
-        self.map = gridmap
+        # Initialize map and endpoints
+        self.cost = np.asarray(gridmap).ravel().tolist()
         self.map_width = map_width
         self.map_height = map_height
-
-        # Initialize open and closed list
-        self.open_list = [self.startnode] # store f of next possible step
-        self.closed_list = [] # store f of minimal path
+        self.end = end
+        start_node = start[0] * map_height + start[1]
+        end_node = end[0] * map_height + end[1]
+
+        # Initialize the cell-indexed arrays
+        n_cells = map_width * map_height
+        self.g = [0.0] * n_cells
+        self.parent = [-1] * n_cells
+        self.order = [-1] * n_cells # insertion order, breaks ties between equal f values
+        self.closed = bytearray(n_cells)
+
+        # Initialize open list with the start node
+        self.order[start_node] = 0
+        self.counter = 1
+        self.open_list = [(0.0, 0, start_node)]
+        self.expanded_nodes = 0
 
         # try to find the path with minimal cost
-        while True:
+        while self.open_list:
 
             # find the node with minimal f in openlist
-            minF = self.getMinNode()
+            _, _, minF = heapq.heappop(self.open_list)
 
-            # add this node to closed_list and delete this node from open_list
-            self.closed_list.append(minF)
-            self.open_list.remove(minF)
+            # add this node to closed list
+            self.closed[minF] = 1
+            self.expanded_nodes += 1
 
-            # apply search to add node for next step in 8 directions
-            self.search(minF, 0, 1)
-            self.search(minF, 1, 0)
-            self.search(minF, 0, -1)
-            self.search(minF, -1, 0)
-            self.search(minF, 1, 1)
-            self.search(minF, 1, -1)
-            self.search(minF, -1, 1)
-            self.search(minF, -1, -1)
-
-            # determine if it the endpoint
-            endnode = self.endPointInCloseList()
-            # if it is endnode, then return a path
-            if endnode:
+            # determine if it the endpoint, if it is endnode, then return a path
+            if minF == end_node:
                 path = []
-                current = endnode
-                while current is not None:
-                    path.append(current.position)
-                    current = current.parent
+                current = minF
+                while current != -1:
+                    path.append(divmod(current, map_height))
+                    current = self.parent[current]
                 return path[::-1]
 
+            # apply search to add node for next step in 8 directions
+            self.search(minF)
+
+        return []
+
 class main():
     """
     implement of global planner, neccessary subscribers and publishers
@@ -185,6 +152,9 @@ class main():
 
     def __init__(self):
 
+        # Paths of recurring start/goal pairs are reused until the costmap changes
+        self.plan_cache = Plan_Cache()
+
         # Initialize Subscribers
         # self.sub_map = rospy.Subscriber('/move_base/global_costmap/costmap', OccupancyGrid, self.callback_costmap)
         self.sub_pos = rospy.Subscriber('/amcl_pose', PoseWithCovarianceStamped, self.callback_pos)
@@ -236,6 +206,9 @@ class main():
         self.origin = OccupancyGrid.info.origin.position
         self.resolution = OccupancyGrid.info.resolution
 
+        # invalidate cached paths if the grid changed
+        self.plan_cache.set_costmap(self.map)
+
     def callback_goal(self, PoseStamped):
         """
         callback of goal
@@ -263,7 +236,6 @@ class main():
 
             # wait for goal input to start global planner
             rospy.wait_for_message('/move_base_simple/goal', PoseStamped)
-            global_planner = Astar_Planner()
 
             # initialize start node
             #TODO:replace initial position using amcl
@@ -274,7 +246,16 @@ class main():
             if self.check_valid(self.goal_x, self.goal_y):
 
                 end = (int(self.goal_x), int(self.goal_y))
-                path = global_planner.astar(self.map, self.map_width, self.map_height, start, end)
+                path = self.plan_cache.get(start, end)
+                if path is None:
+                    global_planner = Astar_Planner()
+                    time_start = time.perf_counter()
+                    path = global_planner.astar(self.map, self.map_width, self.map_height, start, end)
+                    self.plan_cache.put(start, end, path, time.perf_counter() - time_start)
+                rospy.loginfo(self.plan_cache.report())
+                if not path:
+                    rospy.loginfo('Goal cannot be reached')
+                    continue
 
                 # publish path and visulized plan
                 for pa in path:
@@ -2,7 +2,11 @@
 
 import rospy
 import numpy as np
+import heapq
 import tf
+import time
+
+from math import sqrt, inf
 
 from std_msgs.msg import String
 from geometry_msgs.msg import Twist, Point, Quaternion, Pose, PoseStamped, PoseWithCovarianceStamped
@@ -10,108 +14,78 @@ from sensor_msgs.msg import LaserScan
 from nav_msgs.msg import OccupancyGrid, MapMetaData, Path
 from visualization_msgs.msg import Marker
 
+from plan_cache import Plan_Cache
+
 #TODO:add threading
 #TODO:use initial position from amcl node
 
-class Node_end():
-    """
-    A node class for A* Pathfinding
-    @parameter parent: parent node
-    @parameter position: position on map
-    @parameter g: cost from start position to current position
-    @parameter h: heuristic cost from current position to goal
-    @parameter f: sum of g and h
+class Bidirectional_Astar_Planner():
     """
+    Independent Astar_Planner function class
 
-    def __init__(self, parent=None, position=None):
-        self.parent = parent
-        self.position = position
-
-        self.g = 0
-        self.h = 0
-        self.f = 0
+    Bidirectional A* search. Both directions have their own binary heap (with lazy decrease-key) and
+    cell-indexed g, parent and closed arrays. Since each direction can look up the g value of the
+    other direction in O(1), a meeting is detected as soon as a node is generated that has already
+    been reached from the other side. The search stops once the key at the top of one of the heaps
+    is not smaller than the cost of the best meeting found so far: with a consistent heuristic no
+    path through an unexpanded node of that direction can be cheaper, so the returned path has
+    minimal cost.
+
+    Entering a cell costs the length of the step plus cost_factor times its costmap value. Cells
+    with costmap values of at least lethal_cost and unknown cells are not traversable.
+    @parameter expanded_nodes: number of nodes expanded by the last search (both directions)
+    """
 
-    def __eq__(self, other):
-        return self.position == other.position
+    # Costmap values from which on a cell is not traversable
+    lethal_cost = 100
 
-class Node_start():
-    """
-    A node class for A* Pathfinding
-    @parameter parent: parent node
-    @parameter position: position on map
-    @parameter g: cost from start position to current position
-    @parameter h: heuristic cost from current position to goal
-    @parameter f: sum of g and h
-    """
+    # Weight of the costmap value of a cell that is added to the cost to enter it
+    cost_factor = 0.9
 
-    def __init__(self, parent=None, position=None):
-        self.parent = parent
-        self.position = position
+    # Costmap values above which a cell blocks the line of sight when the path is smoothed
+    obstacle_cost = 50
 
-        self.g = 0
-        self.h = 0
-        self.f = 0
+    # 8-connected neighbourhood (offset in x, offset in y, step length)
+    steps = ((0, 1, 1.0), (1, 0, 1.0), (0, -1, 1.0), (-1, 0, 1.0),
+             (1, 1, sqrt(2)), (1, -1, sqrt(2)), (-1, 1, sqrt(2)), (-1, -1, sqrt(2)))
 
-    def __eq__(self, other):
-        return self.position == other.position
+    def __init__(self):
+        self.expanded_nodes = 0
 
-class Bidirectional_Astar_Planner():
-    """
-    Independent Astar_Planner function class
-    """
-    def check_obstacle(self, start, end):
+    def line_cells(self, starts, ends):
         """
-        This function is used to check if there is an obstacle between start point and end point
+        This function is used to get the grid cells on many straight segments at once. Each segment
+        is sampled once per cell along its major axis, the end point itself is not included.
 
-        @return True: if there is an obstacle between start and end
-        @return False: if there is no obstacle between start and end
+        @parameter starts: array of shape (n, 2) with the start points of the segments
+        @parameter ends: array of shape (n, 2) with the end points of the segments
+        @return: x and y coordinates of all cells and the index of the segment each cell belongs to
         """
+        starts = np.asarray(starts, dtype=np.int64).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=np.int64).reshape(-1, 2)
+        diff = ends - starts
+        length = np.max(np.abs(diff), axis=1)
 
-        # get the difference between start and end in x,y axis
-        disx = -(start[0] - end[0])
-        disy = -(start[1] - end[1])
-
-        # The circumstance that difference in x axis is bigger
-        if abs(disx) > abs(disy):
+        # index of the segment and number of the step along the segment for every sampled cell
+        segment = np.repeat(np.arange(len(length)), length)
+        step = np.arange(len(segment)) - np.repeat(np.cumsum(length) - length, length)
 
-            # disx is larger than 0
-            if disx > 0:
-                for i in range(disx):
-                    x = start[0] + i
-                    y = int(start[1] + i * disy / disx)
-                    if self.map[x][y] > 50:
-                        return True
-                return False
-
-            # disx is smaller than 0
-            else:
-                for i in range(-disx):
-                    x = start[0] - i
-                    y = int(start[1] + i * disy / (-disx))
-                    if self.map[x][y] > 50:
-                        return True
-                return False
-
-        # The circumstance that difference in y axis is bigger
-        else:
+        # step along the major axis is exactly one cell, the minor axis is rounded
+        ratio = step / length[segment]
+        x = starts[segment, 0] + np.rint(ratio * diff[segment, 0]).astype(np.int64)
+        y = starts[segment, 1] + np.rint(ratio * diff[segment, 1]).astype(np.int64)
+        return x, y, segment
 
-            # disy is larger than 0
-            if disy > 0:
-                for i in range(disy):
-                    x = int(start[0] + i * disx / disy)
-                    y = start[1] + i
-                    if self.map[x][y] > 50:
-                        return True
-                return False
+    def check_obstacle(self, starts, ends):
+        """
+        This function is used to check if there are obstacles between many pairs of start and end
+        points in one batched lookup of the costmap
 
-            # disy is smaller than 0
-            else:
-                for i in range(-disy):
-                    x = int(start[0] + i * disx / (-disy))
-                    y = start[1] - i
-                    if self.map[x][y] > 50:
-                        return True
-                return False
+        @return: boolean array, True if there is an obstacle between the corresponding start and end
+        """
+        x, y, segment = self.line_cells(starts, ends)
+        hit = self.map[x, y] > self.obstacle_cost
+        return np.bincount(segment[hit], minlength=len(np.asarray(starts).reshape(-1, 2))) > 0
 
     def get_key_point(self, path):
         """
@@ -119,20 +93,15 @@ class Bidirectional_Astar_Planner():
 
         @return: path with only key point
         """
-        # set new path begin at path[0]
-        new_path = [path[0]]
+        path = np.asarray(path)
+        if len(path) < 3:
+            return path[[0, -1]]
 
-        # determine if the moving direction changes, if it does not change, delete the point in middle
-        length_path = len(path)
-        for i in range(2,length_path - 1):
-            vector1 = (path[i-1][0] - path[i-2][0], path[i-1][1] - path[i-2][1])
-            vector2 = (path[i][0] - path[i-1][0], path[i][1] - path[i-1][1])
-            if vector1 != vector2:
-                new_path.append(path[i-1])
-
-        # at last, add the last element in path to new path
-        new_path.append(path[length_path - 1])
-        return new_path
+        # keep the points where the moving direction changes, as well as the first and the last point
+        steps = np.diff(path, axis=0)
+        turn = np.any(steps[1:] != steps[:-1], axis=1)
+        keep = np.concatenate(([True], turn, [True]))
+        return path[keep]
 
     def Path_smoothing(self, path):
         """
@@ -141,309 +110,208 @@ class Bidirectional_Astar_Planner():
         # First merge nodes that the direction do not change, keep key nodes only
         path = self.get_key_point(path)
 
-        # Second using Floyed method to smooth path
-        l = len(path)
-        i = 0
-
         # if the path only contains two key points, return the path
-        if l == 2:
+        if len(path) <= 2:
             return path
 
-        # apply path smoothing function
-        while True:
-            while not self.check_obstacle(path[i], path[i+2]):
-                path.pop(i + 1)
-                l = len(path)
-                if i == l - 2:
-                    break
-            i += 1
-            if i > l - 3:
-                break
-        return path
+        # Second connect each key point with the farthest key point that can be seen from it, all
+        # candidate shortcuts of a key point are checked in one batched call
+        new_path = [path[0]]
+        i = 0
+        while i < len(path) - 1:
+            candidates = np.arange(i + 2, len(path))
+            free = ~self.check_obstacle(np.repeat(path[i:i + 1], len(candidates), axis=0), path[candidates])
+            i = candidates[free][-1] if np.any(free) else i + 1
+            new_path.append(path[i])
+        return np.array(new_path)
 
     def Path_argument(self, path):
         """
         This is a function to make path consists of only key points to dense path
         """
-        # set a new path
-        new_path = []
-
-        # main function of path argument
-        length = len(path)
-        i = 0
-        while True:
+        path = np.asarray(path)
 
-            # break rule
-            if i == length - 1:
-                break
-
-            # difference in x,y axis
-            disx = -(path[i][0] - path[i+1][0])
-            disy = -(path[i][1] - path[i+1][1])
-
-            # if the two key points can directly connected, then pass
-            if abs(disy) == 1 and abs(disy) == 1:
-                pass
-
-            # if there must be other grids between two key points
-            # The circumstance that difference in x axis is bigger
-            if abs(disx) > abs(disy):
-                # disx is larger than 0
-                if disx > 0:
-                    for j in range(disx):
-                        x = path[i][0] + j
-                        y = int(path[i][1] + j * disy / disx)
-                        new_path.append((x, y))
-                # disx is smaller than 0
-                else:
-                    for j in range(-disx):
-                        x = path[i][0] - j
-                        y = int(path[i][1] + j * disy / (-disx))
-                        new_path.append((x, y))
-            # The circumstance that difference in y axis is bigger
-            else:
-                # disy is larger than 0
-                if disy > 0:
-                    for j in range(disy):
-                        x = int(path[i][0] + j * disx / disy)
-                        y = path[i][1] + j
-                        new_path.append((x, y))
-                # disy is smaller than 0
-                else:
-                    for j in range(-disy):
-                        x = int(path[i][0] + j * disx / (-disy))
-                        y = path[i][1] - j
-                        new_path.append((x, y))
-            i += 1
-        return new_path
+        # fill all segments between two key points at once and add the last key point, which is not
+        # part of any segment
+        x, y, _ = self.line_cells(path[:-1], path[1:])
+        x = np.append(x, path[-1, 0])
+        y = np.append(y, path[-1, 1])
+        return list(zip(x.tolist(), y.tolist()))
 
-    def check_direction(self, node_child, node_parent):
+    def blocked(self, node):
         """
-        check the direction of next step
-        if the direction does not change, return 0
-        if the direction changes, return 1
+        @return: True if the cell with index node cannot be entered
         """
-        node_grand = node_parent.parent
-        if not node_grand:
-            return 0
-        vector1 = (node_child.position[0] - node_parent.position[0], node_child.position[1] - node_parent.position[1])
-        vector2 = (node_parent.position[0] - node_grand.position[0], node_parent.position[1] - node_grand.position[1])
-        if vector1 == vector2:
-            return 0
-        return 5
+        cost = self.cost[node]
+        return cost < 0 or cost >= self.lethal_cost
 
-    def getMinNode(self, input_list):
+    def heuristic(self, node, target):
         """
-        try to find the node with minimal f in openlist
-
-        @return: the node with minimal f value
+        @return: closed-form (octile) distance between the cell with index node and the cell target,
+                 a lower bound of the cost since every step costs at least its length
         """
-        currentNode = input_list[0]
-        for node in input_list:
-            if node.f < currentNode.f:
-                currentNode = node
-        return currentNode
+        x, y = divmod(node, self.map_height)
+        dx = abs(x - target[0])
+        dy = abs(y - target[1])
+        return dx + dy + (sqrt(2) - 2) * min(dx, dy)
 
-    def pointInCloseList(self, position, closed_list):
-        """
-        determine if a position is in closelist
+    def nearest_free(self, position):
         """
-        for node in closed_list:
-            if node.position == position:
-                return True
-        return False
+        find the traversable cell that is closest to position, used if the robot is located in a
+        cell that cannot be entered (e.g. within the hard padding)
 
-    def pointInOpenList(self, position, open_list):
+        @return: the closest traversable cell or None if there is none
         """
-        determine if a position is in openlist
-        """
-        for node in open_list:
-            if node.position == position:
-                return node
-        return None
+        cost = np.asarray(self.cost).reshape(self.map_width, self.map_height)
+        free = np.argwhere((cost >= 0) & (cost < self.lethal_cost))
+        if len(free) == 0:
+            return None
+        closest = free[np.argmin(np.sum((free - np.array(position)) ** 2, axis=1))]
+        return (int(closest[0]), int(closest[1]))
 
-    def check_intersection(self, open_start, open_end):
+    def expand(self, direction):
         """
-        find intersection part of two openlist
-        """
-        for node in open_start:
-            append = self.pointInOpenList(node.position, open_end)
-            if append:
-                self.intersect.append(append.position)
-        return self.intersect
+        expand the node with minimal f of one direction and add its neighbours to the openlist of
+        this direction. Neighbours that have already been reached by the other direction are
+        possible meeting points.
 
-    def search_start(self, minF, offsetX, offsetY):
-        """
-        search action for next step and add this node to openlist
+        @parameter direction: 0 for the search from the start, 1 for the search from the goal
         """
+        map_width = self.map_width
+        map_height = self.map_height
+        g, parent, closed = self.g[direction], self.parent[direction], self.closed[direction]
+        g_other = self.g[1 - direction]
+        target = self.targets[direction]
 
-        node_pos = (minF.position[0] + offsetX, minF.position[1] + offsetY)
+        _, node_g, minF = heapq.heappop(self.open_lists[direction])
+        closed[minF] = 1
+        self.expanded_nodes += 1
+        x, y = divmod(minF, map_height)
 
-        # if the offset is out of boundary
-        if node_pos[0] > self.map_width - 1 or node_pos[0] < 0 or node_pos[1] > self.map_height - 1 or node_pos[1] < 0:
-            return
+        # the search from the goal runs over reversed edges, entering minF has to be paid there
+        cost_minF = self.cost[minF] * self.cost_factor
 
-        # if the node is in closed set, then pass
-        elif self.pointInCloseList(node_pos, self.closed_list_start):
-            return
+        for offsetX, offsetY, step in self.steps:
+            node_x = x + offsetX
+            node_y = y + offsetY
 
-        else:
-            # if it is not in openlist, add it to openlist
-            currentNode = self.pointInOpenList(node_pos, self.open_list_start)
-            if not currentNode:
-                currentNode = Node_start(minF, node_pos)
-                currentNode.g = minF.g + np.sqrt(offsetX * offsetX + offsetY * offsetY)
-                dx = abs(node_pos[0] - self.endnode.position[0])
-                dy = abs(node_pos[1] - self.endnode.position[1])
-                turn_cost = self.check_direction(currentNode, minF)
-                # closed-form distance
-                # currentNode.h =  dx + dy + (np.sqrt(2) - 2) * min(dx, dy) + self.map[node_pos[0]][node_pos[1]]
-                # euclidean distance
-                currentNode.h =  dx + dy + self.map[node_pos[0]][node_pos[1]] * 0.9 + turn_cost
-                # real distance
-                # currentNode.h =  np.sqrt(dx * dx + dy * dy) + self.map[node_pos[0]][node_pos[1]]
-                currentNode.f = currentNode.g + currentNode.h
-                self.open_list_start.append(currentNode)
-                return
-            # if it is in openlist, determine if g of currentnode is smaller
+            # if the offset is out of boundary
+            if node_x > map_width - 1 or node_x < 0 or node_y > map_height - 1 or node_y < 0:
+                continue
+
+            node = node_x * map_height + node_y
+            if closed[node] or self.blocked(node):
+                continue
+
+            if direction == 0:
+                new_g = node_g + step + self.cost[node] * self.cost_factor
             else:
-                action_cost = np.sqrt(offsetX * offsetX + offsetY * offsetY)
-                if minF.g + action_cost < currentNode.g:
-                    currentNode.g = minF.g + action_cost
-                    currentNode.parent = minF
-                    return
+                new_g = node_g + step + cost_minF
 
-    def search_end(self, minF, offsetX, offsetY):
-        """
-        search action for next step and add this node to openlist
-        """
+            # if it is not in openlist or its g value improves, (re)add it to openlist
+            if new_g < g[node]:
+                g[node] = new_g
+                parent[node] = minF
+                heapq.heappush(self.open_lists[direction], (new_g + self.heuristic(node, target), new_g, node))
 
-        node_pos = (minF.position[0] + offsetX, minF.position[1] + offsetY)
+                # check if both searches meet in this node
+                if new_g + g_other[node] < self.best_cost:
+                    self.best_cost = new_g + g_other[node]
+                    self.meeting_node = node
 
-        # if the offset is out of boundary
-        if node_pos[0] > self.map_width - 1 or node_pos[0] < 0 or node_pos[1] > self.map_height - 1 or node_pos[1] < 0:
-            return
+    def top_key(self, direction):
+        """
+        remove outdated entries from the top of the openlist of one direction
 
-        # if the node is in closed set, then pass
-        elif self.pointInCloseList(node_pos, self.closed_list_end):
-            return
+        @return: the minimal f value in the openlist of this direction
+        """
+        open_list = self.open_lists[direction]
+        g, closed = self.g[direction], self.closed[direction]
+        while open_list and (closed[open_list[0][2]] or open_list[0][1] > g[open_list[0][2]]):
+            heapq.heappop(open_list)
+        return open_list[0][0] if open_list else inf
 
-        else:
-            # if it is not in openlist, add it to openlist
-            currentNode = self.pointInOpenList(node_pos, self.open_list_end)
-            if not currentNode:
-                currentNode = Node_end(minF, node_pos)
-                currentNode.g = minF.g + np.sqrt(offsetX * offsetX + offsetY * offsetY)
-                dx = abs(node_pos[0] - self.startnode.position[0])
-                dy = abs(node_pos[1] - self.startnode.position[1])
-                turn_cost = self.check_direction(currentNode, minF)
-                # closed-form distance
-                # currentNode.h =  dx + dy + (np.sqrt(2) - 2) * min(dx, dy) + self.map[node_pos[0]][node_pos[1]]
-                # euclidean distance
-                currentNode.h =  dx + dy + self.map[node_pos[0]][node_pos[1]] * 0.9 + turn_cost
-                # real distance
-                # currentNode.h =  np.sqrt(dx * dx + dy * dy) + self.map[node_pos[0]][node_pos[1]]
-                currentNode.f = currentNode.g + currentNode.h
-                self.open_list_end.append(currentNode)
-                return
-            # if it is in openlist, determine if g of currentnode is smaller
-            else:
-                action_cost = np.sqrt(offsetX * offsetX + offsetY * offsetY)
-                if minF.g + action_cost < currentNode.g:
-                    currentNode.g = minF.g + action_cost
-                    currentNode.parent = minF
-                    return
+    def get_path(self):
+        """
+        @return: path from start to goal through the meeting node
+        """
+        path = []
+        current = self.meeting_node
+        while current != -1:
+            path.append(divmod(current, self.map_height))
+            current = self.parent[0][current]
+        path = path[::-1]
+        current = self.parent[1][self.meeting_node]
+        while current != -1:
+            path.append(divmod(current, self.map_height))
+            current = self.parent[1][current]
+        return path
 
     def bi_astar(self, gridmap, map_width, map_height, start, end):
         """
         main function of astar search
 
-        @return: a global path
+        @return: a global path, empty if the goal cannot be reached
         """
 
-        # Initialize endnode and startnode
-        self.startnode = Node_start(None, start)
-        self.startnode.g = self.startnode.h = self.startnode.f = 0
-        self.endnode = Node_end(None, end)
-        self.endnode.g = self.endnode.h = self.endnode.f = 0
-        self.map = gridmap
+        # Initialize map
+        self.map = np.asarray(gridmap)
+        self.cost = self.map.ravel().tolist()
         self.map_width = map_width
         self.map_height = map_height
-
-        # Initialize open and closed list
-        self.open_list_start = [self.startnode] # store f of next possible step
-        self.closed_list_start = [] # store f of minimal path
-        self.open_list_end = [self.endnode]
-        self.closed_list_end = []
-        self.intersect = []
-        start = True
+        self.expanded_nodes = 0
+
+        # Start the search from the closest traversable cell if the start cannot be entered
+        if self.blocked(start[0] * map_height + start[1]):
+            start = self.nearest_free(start)
+            if start is None:
+                return []
+        start_node = start[0] * map_height + start[1]
+        end_node = end[0] * map_height + end[1]
+
+        # Initialize cell-indexed arrays of both directions (0: from start, 1: from goal)
+        n_cells = map_width * map_height
+        self.g = ([inf] * n_cells, [inf] * n_cells)
+        self.parent = ([-1] * n_cells, [-1] * n_cells)
+        self.closed = (bytearray(n_cells), bytearray(n_cells))
+        self.targets = (end, start)
+        self.g[0][start_node] = 0.0
+        self.g[1][end_node] = 0.0
+
+        # Initialize open lists
+        self.open_lists = ([(self.heuristic(start_node, end), 0.0, start_node)],
+                           [(self.heuristic(end_node, start), 0.0, end_node)])
+        self.best_cost = 0.0 if start_node == end_node else inf
+        self.meeting_node = start_node
 
         # try to find the path with minimal cost
         while True:
+            top_start = self.top_key(0)
+            top_end = self.top_key(1)
+
+            # stop if the best meeting cannot be improved anymore
+            if top_start >= self.best_cost or top_end >= self.best_cost:
+                break
+
+            # expand the direction with the smaller openlist
+            if len(self.open_lists[0]) <= len(self.open_lists[1]):
+                self.expand(0)
+            else:
+                self.expand(1)
 
-            # find the node with minimal f in openlist
-            minF_start = self.getMinNode(self.open_list_start)
-            minF_end = self.getMinNode(self.open_list_end)
-
-            # add this node to closed_list and delete this node from open_list
-            self.closed_list_start.append(minF_start)
-            self.open_list_start.remove(minF_start)
-            self.closed_list_end.append(minF_end)
-            self.open_list_end.remove(minF_end)
-
-            # apply search to add node for next step in 8 directions
-            self.search_end(minF_end, 0, 1)
-            self.search_end(minF_end, 1, 0)
-            self.search_end(minF_end, 0, -1)
-            self.search_end(minF_end, -1, 0)
-            self.search_end(minF_end, 1, 1)
-            self.search_end(minF_end, 1, -1)
-            self.search_end(minF_end, -1, 1)
-            self.search_end(minF_end, -1, -1)
-
-            self.search_start(minF_start, 0, 1)
-            self.search_start(minF_start, 1, 0)
-            self.search_start(minF_start, 0, -1)
-            self.search_start(minF_start, -1, 0)
-            self.search_start(minF_start, 1, 1)
-            self.search_start(minF_start, 1, -1)
-            self.search_start(minF_start, -1, 1)
-            self.search_start(minF_start, -1, -1)
-
-            self.intersect = self.check_intersection(self.open_list_start, self.open_list_end)
-            if self.intersect:
-                # get the intersection position with minimal f value
-                minpos = self.intersect[0]
-                current_f = self.pointInOpenList(minpos, self.open_list_start).f + self.pointInOpenList(minpos, self.open_list_end).f
-                for pos in self.intersect:
-                    node_start = self.pointInOpenList(pos, self.open_list_start)
-                    node_end = self.pointInOpenList(pos, self.open_list_end)
-                    f = node_start.f + node_end.f
-                    if f < current_f:
-                        current_f = f
-                        minpos = pos
-
-                #generate path
-                path = []
-                current = self.pointInOpenList(minpos, self.open_list_end)
-                while current is not None:
-                    path.append(current.position)
-                    current = current.parent
-                path = path[1:]
-                path = path[::-1]
-                current = node_start
-                while current is not None:
-                    path.append(current.position)
-                    current = current.parent
-
-                # apply path smoothing function
-                path = self.Path_smoothing(path)
-
-                # apply path argument function
-                path = self.Path_argument(path)
-
-                # return path
-                return path[::-1]
+        if self.best_cost == inf:
+            return []
+
+        path = self.get_path()
+
+        # apply path smoothing function
+        path = self.Path_smoothing(path)
+
+        # apply path argument function
+        path = self.Path_argument(path)
+
+        # return path
+        return path
 
 class main():
     """
@@ -452,6 +320,9 @@ class main():
 
     def __init__(self):
 
+        # Paths of recurring start/goal pairs are reused until the costmap changes
+        self.plan_cache = Plan_Cache()
+
         # Initialize Subscribers
         rospy.wait_for_message('/global_costmap', OccupancyGrid)
         # self.sub_map = rospy.Subscriber('/move_base/global_costmap/costmap', OccupancyGrid, self.callback_costmap)
@@ -495,6 +366,9 @@ class main():
         self.origin = OccupancyGrid.info.origin.position
         self.resolution = OccupancyGrid.info.resolution
 
+        # invalidate cached paths if the grid changed
+        self.plan_cache.set_costmap(self.map)
+
     # Wait for amcl part to provide it with initial position
     def callback_pos(self, PoseStamped):
         """
@@ -537,7 +411,6 @@ class main():
 
             # wait for goal input to start global planner
             rospy.wait_for_message('/move_base_simple/goal', PoseStamped)
-            global_planner = Bidirectional_Astar_Planner()
 
             # initialize start node
             #TODO:replace initial position using amcl
@@ -549,7 +422,16 @@ class main():
             if self.check_valid(self.goal_x, self.goal_y):
 
                 end = (int(self.goal_x), int(self.goal_y))
-                path = global_planner.bi_astar(self.map, self.map_width, self.map_height, start, end)
+                path = self.plan_cache.get(start, end)
+                if path is None:
+                    global_planner = Bidirectional_Astar_Planner()
+                    time_start = time.perf_counter()
+                    path = global_planner.bi_astar(self.map, self.map_width, self.map_height, start, end)
+                    self.plan_cache.put(start, end, path, time.perf_counter() - time_start)
+                rospy.loginfo(self.plan_cache.report())
+                if not path:
+                    rospy.loginfo('Goal cannot be reached')
+                    continue
 
                 # publish path
                 for pa in path:
@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+
+"""
+Offline benchmark of the global planners on the maps of the rto_map_server package.
+
+The maps are converted the same way as in the map server and queried with random start/goal
+pairs that lie far apart. With --legacy the heap based Astar_Planner is compared against the
+original list based implementation, which also checks that both return the same paths. With --jps
+the number of nodes expanded by the jump point search is reported as well. With --hpa the abstract
+graph of the hierarchical planner is built once per map and its queries are timed separately, each
+query is checked against a search on the full grid with the same step rules, so that a goal which
+is reachable is never missed by the abstract graph. With --dstar the repaired searches of the D* Lite
+planner are checked on random grids: the robot moves along the path and cells change between the
+calls, every repaired path has to reach the goal with the cost of a search from scratch.
+
+        rosrun rto_global_planner benchmark_planners.py --queries 5 --legacy
+        rosrun rto_global_planner benchmark_planners.py --maps --dstar 100
+"""
+
+import argparse
+import os
+import time
+
+import cv2
+import numpy as np
+
+from astar_planner import Astar_Planner
+from jmp_planner import Jps_Planner
+from hpa_planner import Hpa_Planner
+from dstar_lite_planner import Dstar_Lite_Planner
+
+
+MAPS_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..', 'rto_map_server', 'maps')
+
+
+class Legacy_Node():
+    """
+    A node class of the list based A* search
+    """
+
+    def __init__(self, parent=None, position=None):
+        self.parent = parent
+        self.position = position
+
+        self.g = 0
+        self.h = 0
+        self.f = 0
+
+
+class Legacy_Astar_Planner():
+    """
+    List based A* search that was used by the global planner before the heap based search core
+    """
+
+    def getMinNode(self):
+        currentNode = self.open_list[0]
+        for node in self.open_list:
+            if node.f < currentNode.f:
+                currentNode = node
+        return currentNode
+
+    def pointInCloseList(self, position):
+        for node in self.closed_list:
+            if node.position == position:
+                return True
+        return False
+
+    def pointInOpenList(self, position):
+        for node in self.open_list:
+            if node.position == position:
+                return node
+        return None
+
+    def endPointInCloseList(self):
+        for node in self.closed_list:
+            if node.position == self.endnode.position:
+                return node
+        return None
+
+    def search(self, minF, offsetX, offsetY):
+        node_pos = (minF.position[0] + offsetX, minF.position[1] + offsetY)
+        if node_pos[0] > self.map_width - 1 or node_pos[0] < 0 or node_pos[1] > self.map_height - 1 or node_pos[1] < 0:
+            return
+        elif self.pointInCloseList(node_pos):
+            return
+        currentNode = self.pointInOpenList(node_pos)
+        if not currentNode:
+            currentNode = Legacy_Node(minF, node_pos)
+            currentNode.g = minF.g + np.sqrt(offsetX * offsetX + offsetY * offsetY)
+            dx = abs(node_pos[0] - self.endnode.position[0])
+            dy = abs(node_pos[1] - self.endnode.position[1])
+            currentNode.h = np.sqrt(dx * dx + dy * dy) + self.map[node_pos[0]][node_pos[1]]
+            currentNode.f = currentNode.g + currentNode.h
+            self.open_list.append(currentNode)
+        else:
+            action_cost = np.sqrt(offsetX * offsetX + offsetY * offsetY)
+            if minF.g + action_cost < currentNode.g:
+                currentNode.g = minF.g + action_cost
+                currentNode.parent = minF
+
+    def astar(self, gridmap, map_width, map_height, start, end):
+        self.endnode = Legacy_Node(None, end)
+        self.map = gridmap
+        self.map_width = map_width
+        self.map_height = map_height
+        self.open_list = [Legacy_Node(None, start)]
+        self.closed_list = []
+        self.expanded_nodes = 0
+
+        while True:
+            minF = self.getMinNode()
+            self.closed_list.append(minF)
+            self.open_list.remove(minF)
+            self.expanded_nodes += 1
+            for offsetX, offsetY, _ in Astar_Planner.steps:
+                self.search(minF, offsetX, offsetY)
+            endnode = self.endPointInCloseList()
+            if endnode:
+                path = []
+                current = endnode
+                while current is not None:
+                    path.append(current.position)
+                    current = current.parent
+                return path[::-1]
+
+
+def load_map(name):
+    """
+    Load a map of the map server and convert it to the [x][y] indexed grid used by the planners
+
+    @return: grid map of shape (width, height)
+    """
+    map_raw = cv2.imread(os.path.join(MAPS_DIR, name + '.pgm'), cv2.IMREAD_GRAYSCALE).astype(np.int8)
+    map_raw[map_raw == 0] = 100
+    map_raw[map_raw == -51] = -1
+    map_raw[map_raw == -2] = 0
+    return np.transpose(np.flip(map_raw, axis=0)).astype(np.int64)
+
+
+def sample_queries(gridmap, nr_queries, rng, candidates=50):
+    """
+    Sample start/goal pairs in free space. For each start the goal is the farthest of a number of
+    random free cells, which results in long, cross-map queries.
+    """
+    free = np.argwhere(gridmap == 0)
+    queries = []
+    for _ in range(nr_queries):
+        start = free[rng.integers(len(free))]
+        goals = free[rng.integers(len(free), size=candidates)]
+        goal = goals[np.argmax(np.sum((goals - start) ** 2, axis=1))]
+        queries.append((tuple(int(v) for v in start), tuple(int(v) for v in goal)))
+    return queries
+
+
+def run_planner(search, gridmap, start, end):
+    """
+    @parameter search: bound search method of a planner, e.g. Astar_Planner().astar
+    @return: path, run time in s and number of expanded nodes
+    """
+    time_start = time.perf_counter()
+    path = search(gridmap, gridmap.shape[0], gridmap.shape[1], start, end)
+    time_took = time.perf_counter() - time_start
+    return path, time_took, search.__self__.expanded_nodes
+
+
+def path_cost(gridmap, path, cost_factor):
+    """
+    @return: cost of a path with the cost model of the planners (step length plus cost_factor times
+             the costmap value of the entered cell)
+    """
+    return sum(np.hypot(b[0] - a[0], b[1] - a[1]) + gridmap[b] * cost_factor for a, b in zip(path, path[1:]))
+
+
+def check_dstar_repairs(rng, nr_grids, nr_steps=16, max_changed_cells=15):
+    """
+    Repeat D* Lite repairs on random grids. Between the calls the robot moves a few cells along the
+    path and some random cells change. Every result is compared with a search from scratch.
+
+    @return: number of calls and number of calls whose path differs in reachability or cost
+    """
+    calls, failures = 0, 0
+    for _ in range(nr_grids):
+        width, height = (int(v) for v in rng.integers(30, 70, 2))
+        gridmap = np.where(rng.random((width, height)) < 0.5, 0, rng.integers(0, 99, (width, height)))
+        gridmap[rng.random((width, height)) < 0.15] = 100
+        free = np.argwhere(gridmap < 100)
+        start, end = (tuple(int(v) for v in free[rng.integers(len(free))]) for _ in range(2))
+
+        planner = Dstar_Lite_Planner()
+        for _ in range(nr_steps):
+            path = planner.dstar(gridmap, width, height, start, end)
+            path_scratch = Dstar_Lite_Planner().dstar(gridmap, width, height, start, end)
+            calls += 1
+            if bool(path) != bool(path_scratch) or (path and (path[0] != start or path[-1] != end or abs(
+                    path_cost(gridmap, path, planner.cost_factor) -
+                    path_cost(gridmap, path_scratch, planner.cost_factor)) > 1e-6)):
+                failures += 1
+
+            # move the robot along the path and change some cells
+            if len(path_scratch) > 6:
+                start = path_scratch[rng.integers(1, 6)]
+            gridmap = gridmap.copy()
+            for _ in range(rng.integers(1, max_changed_cells + 1)):
+                cell = (int(rng.integers(width)), int(rng.integers(height)))
+                if cell not in (start, end):
+                    gridmap[cell] = rng.choice([0, 30, 100])
+    return calls, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the global planners.')
+    parser.add_argument('--maps', nargs='*', default=['sim_simple', 'sample', 'home-rd'])
+    parser.add_argument('--queries', type=int, default=5, help='number of start/goal pairs per map')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--legacy', action='store_true', help='compare against the list based search (slow)')
+    parser.add_argument('--jps', action='store_true', help='run the jump point search as well')
+    parser.add_argument('--hpa', action='store_true', help='run the hierarchical planner as well')
+    parser.add_argument('--dstar', type=int, default=0, metavar='GRIDS',
+                        help='check repaired D* Lite searches on this number of random grids')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+
+    if args.dstar:
+        calls, failures = check_dstar_repairs(rng, args.dstar)
+        print('D* Lite repairs: {} of {} calls differ from a search from scratch'.format(failures, calls))
+
+    for name in args.maps:
+        gridmap = load_map(name)
+        print('Map {} ({}x{})'.format(name, gridmap.shape[0], gridmap.shape[1]))
+
+        if args.hpa:
+            hpa_planner = Hpa_Planner()
+            time_start = time.perf_counter()
+            hpa_planner.build(gridmap)
+            print('  hpa abstract graph built in {:.3f}s'.format(time.perf_counter() - time_start))
+
+        times_heap, times_legacy = [], []
+        for start, end in sample_queries(gridmap, args.queries, rng):
+            path, time_heap, expanded = run_planner(Astar_Planner().astar, gridmap, start, end)
+            times_heap.append(time_heap)
+            line = '  {} -> {}: {} cells, {} expanded, heap {:.3f}s'.format(start, end, len(path), expanded, time_heap)
+
+            if args.legacy:
+                path_legacy, time_legacy, _ = run_planner(Legacy_Astar_Planner().astar, gridmap, start, end)
+                times_legacy.append(time_legacy)
+                line += ', list {:.3f}s, speedup {:.0f}x, same path: {}'.format(
+                    time_legacy, time_legacy / time_heap, path == path_legacy)
+
+            if args.jps:
+                path_jps, time_jps, expanded_jps = run_planner(Jps_Planner().jps, gridmap, start, end)
+                line += ', jps {:.3f}s with {} expanded'.format(time_jps, expanded_jps)
+                if not path_jps:
+                    line += ' (no collision free path)'
+
+            if args.hpa:
+                time_start = time.perf_counter()
+                path_hpa = hpa_planner.plan(start, end)
+                line += ', hpa {:.3f}s with {} expanded'.format(time.perf_counter() - time_start,
+                                                                hpa_planner.expanded_nodes)
+                if not path_hpa:
+                    line += ' (no collision free path)'
+
+                # the refinement on a corridor of all clusters is a search on the full grid
+                all_clusters = set(np.ndindex(hpa_planner.clusters_x, hpa_planner.clusters_y))
+                path_full = hpa_planner.refine(start, end, all_clusters)
+                if bool(path_hpa) != bool(path_full):
+                    line += ' MISMATCH: full grid search {} a path'.format('finds' if path_full else 'does not find')
+            print(line)
+
+        summary = '  mean heap {:.3f}s'.format(np.mean(times_heap))
+        if args.legacy:
+            summary += ', mean list {:.3f}s, speedup {:.0f}x'.format(np.mean(times_legacy),
+                                                                    np.sum(times_legacy) / np.sum(times_heap))
+        print(summary)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,412 @@
+#!/usr/bin/env python
+
+import rospy
+import numpy as np
+import heapq
+import tf
+
+from math import sqrt, inf
+from threading import Lock
+
+from std_msgs.msg import String
+from geometry_msgs.msg import Twist, Point, Quaternion, Pose, PoseStamped, PoseWithCovarianceStamped
+from sensor_msgs.msg import LaserScan
+from nav_msgs.msg import OccupancyGrid, MapMetaData, Path
+from visualization_msgs.msg import Marker
+
+class Dstar_Lite_Planner():
+    """
+    Independent Dstar_Lite_Planner function class
+
+    D* Lite searches backwards from the goal to the robot and keeps its search state (g and rhs
+    values and the priority queue) between calls for the same goal. When cells of the costmap
+    change, only the vertices whose outgoing edges enter these cells are updated, and when the
+    robot moves, the key modifier km is increased instead of reordering the queue. The following
+    search only repairs the part of the search tree that is affected by these changes.
+
+    The open list is a binary heap with lazy deletion, the current key of every queued vertex is
+    kept in a dict. g and rhs values are kept in flat arrays indexed by cell (index = x *
+    map_height + y). Entering a cell costs the length of the step plus cost_factor times its
+    costmap value. Cells with costmap values of at least lethal_cost and unknown cells cannot be
+    entered. If more than reset_fraction of the cells changed, the search starts from scratch.
+    @parameter expanded_nodes: number of nodes expanded by the last call
+    @parameter changed_cells: number of changed cells that were processed by the last call
+    """
+
+    # Costmap values from which on a cell is not traversable
+    lethal_cost = 100
+
+    # Weight of the costmap value of a cell that is added to the cost to enter it
+    cost_factor = 0.9
+
+    # Fraction of changed cells above which the search is restarted instead of repaired
+    reset_fraction = 0.1
+
+    # Number of decimals to which keys are rounded, the sums of g, h and km have floating point errors that
+    # would otherwise decide the order of keys which are equal (the stop condition needs ties to compare g)
+    key_decimals = 9
+
+    # 8-connected neighbourhood (offset in x, offset in y, step length)
+    steps = ((0, 1, 1.0), (1, 0, 1.0), (0, -1, 1.0), (-1, 0, 1.0),
+             (1, 1, sqrt(2)), (1, -1, sqrt(2)), (-1, 1, sqrt(2)), (-1, -1, sqrt(2)))
+
+    def __init__(self):
+        self.expanded_nodes = 0
+        self.changed_cells = 0
+        self.map = None
+        self.end = None
+
+    def reset(self, gridmap, start, end):
+        """
+        initialize the search state for a new goal or costmap size
+        """
+        self.map = np.array(gridmap, dtype=np.int64)
+        self.map_width, self.map_height = self.map.shape
+        self.cost = self.map.ravel().tolist()
+        self.start = start
+        self.end = end
+
+        n_cells = self.map_width * self.map_height
+        self.g = [inf] * n_cells
+        self.rhs = [inf] * n_cells
+        self.km = 0.0
+
+        end_node = end[0] * self.map_height + end[1]
+        self.rhs[end_node] = 0.0
+        self.open_list = []
+        self.open_keys = {}
+        self.push(end_node)
+
+    def blocked(self, node):
+        """
+        @return: True if the cell with index node cannot be entered
+        """
+        cost = self.cost[node]
+        return cost < 0 or cost >= self.lethal_cost
+
+    def heuristic(self, node, target):
+        """
+        @return: closed-form (octile) distance between the cell with index node and the cell target,
+                 a lower bound of the cost since every step costs at least its length
+        """
+        x, y = divmod(node, self.map_height)
+        dx = abs(x - target[0])
+        dy = abs(y - target[1])
+        return dx + dy + (sqrt(2) - 2) * min(dx, dy)
+
+    def neighbours(self, node):
+        """
+        @return: cell indices and step lengths of the neighbours of a cell within the map
+        """
+        map_width, map_height = self.map_width, self.map_height
+        x, y = divmod(node, map_height)
+        for offsetX, offsetY, step in self.steps:
+            node_x = x + offsetX
+            node_y = y + offsetY
+            if node_x > map_width - 1 or node_x < 0 or node_y > map_height - 1 or node_y < 0:
+                continue
+            yield node_x * map_height + node_y, step
+
+    def calculate_key(self, node):
+        """
+        @return: key of a vertex, the queue is ordered by it
+        """
+        g = min(self.g[node], self.rhs[node])
+        return (round(g + self.heuristic(node, self.start) + self.km, self.key_decimals), round(g, self.key_decimals))
+
+    def push(self, node):
+        """
+        add a vertex to the queue or update its key, outdated entries stay in the heap
+        """
+        key = self.calculate_key(node)
+        self.open_keys[node] = key
+        heapq.heappush(self.open_list, (key[0], key[1], node))
+
+    def top(self):
+        """
+        remove outdated entries from the top of the queue
+
+        @return: the minimal key in the queue and its vertex, or (inf, inf) and None if it is empty
+        """
+        open_list = self.open_list
+        while open_list and self.open_keys.get(open_list[0][2]) != open_list[0][:2]:
+            heapq.heappop(open_list)
+        if not open_list:
+            return (inf, inf), None
+        return open_list[0][:2], open_list[0][2]
+
+    def update_vertex(self, node):
+        """
+        recompute the rhs value of a vertex (the best cost over its successors) and queue it if
+        it is locally inconsistent
+        """
+        if node != self.end[0] * self.map_height + self.end[1]:
+            rhs = inf
+            for other, step in self.neighbours(node):
+                if not self.blocked(other):
+                    rhs = min(rhs, self.g[other] + step + self.cost[other] * self.cost_factor)
+            self.rhs[node] = rhs
+
+        if self.g[node] != self.rhs[node]:
+            self.push(node)
+        else:
+            self.open_keys.pop(node, None)
+
+    def compute_shortest_path(self):
+        """
+        expand locally inconsistent vertices until the start is consistent and its key is not
+        larger than the minimal key in the queue
+        """
+        start_node = self.start[0] * self.map_height + self.start[1]
+        while True:
+            key, node = self.top()
+            if node is None or (key >= self.calculate_key(start_node) and self.rhs[start_node] == self.g[start_node]):
+                return
+
+            new_key = self.calculate_key(node)
+            if key < new_key:
+                # the key is outdated since the robot moved
+                self.push(node)
+                continue
+
+            heapq.heappop(self.open_list)
+            del self.open_keys[node]
+            self.expanded_nodes += 1
+
+            if self.g[node] > self.rhs[node]:
+                # overconsistent, the vertex gets its final value
+                self.g[node] = self.rhs[node]
+                for other, _ in self.neighbours(node):
+                    self.update_vertex(other)
+            else:
+                # underconsistent, the vertex and its predecessors are recomputed
+                self.g[node] = inf
+                self.update_vertex(node)
+                for other, _ in self.neighbours(node):
+                    self.update_vertex(other)
+
+    def update_start(self, start):
+        """
+        move the start of the search to the current position of the robot
+        """
+        if start != self.start:
+            self.km += self.heuristic(self.start[0] * self.map_height + self.start[1], start)
+            self.start = start
+
+    def update_costmap(self, gridmap):
+        """
+        apply the changed cells of a new costmap of the same size, the vertices whose edges enter a
+        changed cell are updated
+
+        @return: False if too many cells changed and the search has to be restarted
+        """
+        gridmap = np.asarray(gridmap)
+        changed = np.flatnonzero(gridmap != self.map)
+        self.changed_cells = len(changed)
+        if len(changed) > self.reset_fraction * gridmap.size:
+            return False
+
+        self.map = np.array(gridmap, dtype=np.int64)
+        for node in changed.tolist():
+            self.cost[node] = int(self.map.flat[node])
+        for node in changed.tolist():
+            for other, _ in self.neighbours(node):
+                self.update_vertex(other)
+        return True
+
+    def get_path(self):
+        """
+        follow the best successors from the start to the goal
+
+        @return: path from start to goal, empty if the goal cannot be reached or the successors run
+                 into a loop (the g values are not consistent)
+        """
+        node = self.start[0] * self.map_height + self.start[1]
+        end_node = self.end[0] * self.map_height + self.end[1]
+        if self.g[node] == inf and node != end_node:
+            return []
+
+        path = [divmod(node, self.map_height)]
+        visited = {node}
+        while node != end_node:
+            best, best_cost = None, inf
+            for other, step in self.neighbours(node):
+                if not self.blocked(other):
+                    cost = self.g[other] + step + self.cost[other] * self.cost_factor
+                    if cost < best_cost:
+                        best, best_cost = other, cost
+            if best is None or best in visited:
+                return []
+            node = best
+            visited.add(node)
+            path.append(divmod(node, self.map_height))
+        return path
+
+    def dstar(self, gridmap, map_width, map_height, start, end):
+        """
+        main function of D* Lite search. The search state is reused if the goal and the size of the
+        costmap did not change since the last call, otherwise it is initialized again.
+
+        @return: a global path, empty if the goal cannot be reached
+        """
+        self.expanded_nodes = 0
+        self.changed_cells = 0
+
+        repaired = False
+        if self.map is None or self.end != end or self.map.shape != (map_width, map_height):
+            self.reset(gridmap, start, end)
+        else:
+            self.update_start(start)
+            repaired = self.update_costmap(gridmap)
+            if not repaired:
+                self.reset(gridmap, start, end)
+
+        self.compute_shortest_path()
+        path = self.get_path()
+
+        # a repaired search whose start has a finite cost but no path to the goal is inconsistent,
+        # it is planned again from scratch
+        if not path and repaired and self.g[start[0] * self.map_height + start[1]] < inf:
+            rospy.logwarn('D* Lite repair returned no path, planning from scratch')
+            self.reset(gridmap, start, end)
+            self.compute_shortest_path()
+            path = self.get_path()
+        return path
+
+class main():
+    """
+    implement of global planner, neccessary subscribers and publishers
+    """
+
+    def __init__(self):
+
+        # The search state is kept between the plans for the same goal
+        self.dstar_planner = Dstar_Lite_Planner()
+        self.lock = Lock()
+        self.goal_active = False
+        self.replan = False
+
+        # Initialize Subscribers
+        rospy.wait_for_message('/global_costmap', OccupancyGrid)
+        self.sub_map = rospy.Subscriber('/global_costmap', OccupancyGrid, self.callback_costmap)
+        self.sub_pos = rospy.Subscriber('/pose', PoseStamped, self.callback_pos)
+        self.sub_goal = rospy.Subscriber('/move_base_simple/goal', PoseStamped, self.callback_goal)
+
+        # Initialize Publisher
+        self.pub_path = rospy.Publisher('/global_path', Path, queue_size=10)
+        self.pub_plan = rospy.Publisher('/visualization/plan', Marker, queue_size=10)
+
+        # Initialize messages
+        self.msg_path = Path()
+        self.msg_path.header.stamp = rospy.Time.now()
+        self.msg_path.header.frame_id = "path"
+
+        self.msg_path_marker = Marker()
+        self.msg_path_marker.header.frame_id = "map"
+        self.msg_path_marker.ns = "navigation"
+        self.msg_path_marker.id = 0
+        self.msg_path_marker.type = Marker.LINE_STRIP
+        self.msg_path_marker.action = Marker.ADD
+        self.msg_path_marker.scale.x = 0.1
+        self.msg_path_marker.color.a = 0.5
+        self.msg_path_marker.color.r = 0.0
+        self.msg_path_marker.color.g = 0.0
+        self.msg_path_marker.color.b = 1.0
+        self.msg_path_marker.pose.orientation = Quaternion(0, 0, 0, 1)
+
+    def callback_costmap(self, OccupancyGrid):
+        """
+        callback of costmap, a changed costmap is repaired in the next cycle of run
+        """
+        self.lock.acquire()
+        self.map_input = np.array(OccupancyGrid.data)
+        self.map_width = OccupancyGrid.info.width
+        self.map_height = OccupancyGrid.info.height
+        self.map = self.map_input.reshape(self.map_height, self.map_width) # shape of 169(width)*116(height)
+        self.map = np.transpose(self.map)
+        self.origin = OccupancyGrid.info.origin.position
+        self.resolution = OccupancyGrid.info.resolution
+        self.replan = self.goal_active
+        self.lock.release()
+
+    def callback_pos(self, PoseStamped):
+        """
+        callback of position
+        """
+        self.pos_x = int((PoseStamped.pose.position.x - self.origin.x) / self.resolution)
+        self.pos_y = int((PoseStamped.pose.position.y - self.origin.y) / self.resolution)
+
+    def callback_goal(self, PoseStamped):
+        """
+        callback of goal
+        """
+        # shift position to position in map
+        self.goal_x = int((PoseStamped.pose.position.x - self.origin.x) / self.resolution)
+        self.goal_y = int((PoseStamped.pose.position.y - self.origin.y) / self.resolution)
+        self.lock.acquire()
+        self.goal_active = True
+        self.replan = True
+        self.lock.release()
+
+    def check_valid(self, goalx, goaly):
+        """
+        check the validility of goal
+        """
+        if goalx > self.map_width - 1 or goalx < 0 or goaly > self.map_height - 1 or goaly < 0:
+            rospy.logwarn('Goal is out of boundary')
+            return None
+        elif self.map[int(goalx)][int(goaly)] < 90 and self.map[int(goalx)][int(goaly)] > -1:
+            return True
+        else:
+            return None
+
+    # run dstar node, a new goal or a changed costmap is planned within one cycle
+    def run(self, rate: float = 10):
+
+        rate = rospy.Rate(rate)
+        while not rospy.is_shutdown():
+            rate.sleep()
+
+            self.lock.acquire()
+            replan, self.replan = self.replan, False
+            gridmap = self.map
+            self.lock.release()
+            if not replan:
+                continue
+
+            # initialize start node
+            start = (self.pos_x, self.pos_y)
+
+            if self.check_valid(self.goal_x, self.goal_y):
+
+                end = (int(self.goal_x), int(self.goal_y))
+                path = self.dstar_planner.dstar(gridmap, self.map_width, self.map_height, start, end)
+                if not path:
+                    rospy.loginfo('Goal cannot be reached')
+                    continue
+
+                # publish path and visulized plan
+                for pa in path:
+                    pose = PoseStamped()
+                    pose.pose.position.x = (pa[0] + 0.5) * self.resolution + self.origin.x
+                    pose.pose.position.y = (pa[1] + 0.5) * self.resolution + self.origin.y
+                    self.msg_path_marker.points.append(Point(pose.pose.position.x, pose.pose.position.y, 0))
+                    self.msg_path.poses.append(pose)
+                self.pub_plan.publish(self.msg_path_marker)
+                self.pub_path.publish(self.msg_path)
+                self.msg_path.poses.clear()
+                self.msg_path_marker.points.clear()
+                rospy.loginfo('Path is published ({} nodes expanded, {} changed cells)'.format(
+                    self.dstar_planner.expanded_nodes, self.dstar_planner.changed_cells))
+
+            else:
+                self.goal_active = False
+                rospy.loginfo('Goal is not valid')
+
+
+
+if __name__ == "__main__":
+   rospy.init_node('rto_global_planner')
+
+   main = main()
+   main.run(rate=10)
\ No newline at end of file
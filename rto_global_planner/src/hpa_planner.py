@@ -0,0 +1,586 @@
+#!/usr/bin/env python
+
+import rospy
+import numpy as np
+import heapq
+import tf
+
+from math import sqrt, inf
+from threading import Lock
+
+from std_msgs.msg import String
+from geometry_msgs.msg import Twist, Point, Quaternion, Pose, PoseStamped, PoseWithCovarianceStamped
+from sensor_msgs.msg import LaserScan
+from nav_msgs.msg import OccupancyGrid, MapMetaData, Path
+from visualization_msgs.msg import Marker
+
+class Hpa_Planner():
+    """
+    Independent Hpa_Planner function class
+
+    Hierarchical path-finding A* (HPA*). The costmap is divided into square clusters of
+    cluster_size cells. Along the border of two neighbouring clusters, every maximal run of cells
+    that are traversable on both sides is an entrance, which gets one transition in its middle
+    or, if it is wider than max_entrance_width, one at each end. Diagonal steps across a border or
+    across the corner of four clusters that cannot be replaced by steps through an entrance get a
+    transition of their own. The two cells of a transition are
+    nodes of the abstract graph and are connected by an inter-edge, the nodes of a cluster are
+    connected by intra-edges whose costs are precomputed with a search restricted to the
+    cluster. The searches from all nodes of many clusters run at once as a vectorized relaxation.
+
+    A query connects start and goal to the nodes of their clusters, searches the abstract graph
+    and refines the result with an A* that is restricted to the corridor of clusters on the
+    abstract path. When a new costmap arrives, only the clusters whose cells changed (and the
+    clusters that share a border with them) are rebuilt.
+
+    Entering a cell costs the length of the step plus cost_factor times its costmap value. Cells
+    with costmap values of at least lethal_cost and unknown cells are not traversable.
+    @parameter expanded_nodes: number of nodes expanded by the last search (abstract graph and refinement)
+    @parameter rebuilt_clusters: number of clusters whose intra-edges were computed by the last build
+    """
+
+    # Costmap values from which on a cell is not traversable
+    lethal_cost = 100
+
+    # Weight of the costmap value of a cell that is added to the cost to enter it
+    cost_factor = 0.9
+
+    # Side length of a cluster in cells
+    cluster_size = 16
+
+    # Entrances that are wider get a transition at each end instead of one in their middle
+    max_entrance_width = 6
+
+    # 8-connected neighbourhood (offset in x, offset in y, step length)
+    steps = ((0, 1, 1.0), (1, 0, 1.0), (0, -1, 1.0), (-1, 0, 1.0),
+             (1, 1, sqrt(2)), (1, -1, sqrt(2)), (-1, 1, sqrt(2)), (-1, -1, sqrt(2)))
+
+    def __init__(self):
+        self.expanded_nodes = 0
+        self.rebuilt_clusters = 0
+        self.map = None
+
+    def build(self, gridmap):
+        """
+        build the abstract graph of a costmap. If a costmap of the same size has been built before,
+        only the clusters whose cells changed are rebuilt.
+
+        @parameter gridmap: costmap indexed by [x][y]
+        """
+        gridmap = np.array(gridmap, dtype=np.int64)
+        size = self.cluster_size
+
+        if self.map is None or self.map.shape != gridmap.shape:
+            self.map_width, self.map_height = gridmap.shape
+            self.clusters_x = -(-self.map_width // size)
+            self.clusters_y = -(-self.map_height // size)
+            self.transitions = {}
+            self.inter_edges = {}
+            self.intra_edges = {}
+            changed = np.ones((self.clusters_x, self.clusters_y), dtype=bool)
+        else:
+            diff = np.zeros((self.clusters_x * size, self.clusters_y * size), dtype=bool)
+            diff[:self.map_width, :self.map_height] = gridmap != self.map
+            changed = diff.reshape(self.clusters_x, size, self.clusters_y, size).any(axis=(1, 3))
+
+        self.map = gridmap
+        self.cost = gridmap.ravel().tolist()
+
+        # cost to enter each cell, padded to whole clusters with non traversable cells
+        enter_cost = np.full((self.clusters_x * size, self.clusters_y * size), inf)
+        traversable = (gridmap >= 0) & (gridmap < self.lethal_cost)
+        enter_cost[:self.map_width, :self.map_height] = np.where(traversable, gridmap * self.cost_factor, inf)
+        self.enter_cost = enter_cost
+
+        # the borders of changed clusters get new transitions, which changes the nodes of the
+        # clusters on the other side as well
+        affected = set()
+        for cx, cy in zip(*np.nonzero(changed)):
+            for border in self.cluster_borders(cx, cy):
+                if self.update_border(*border):
+                    affected.update(self.border_clusters(*border))
+            affected.add((cx, cy))
+
+        self.update_intra_edges(sorted(affected))
+
+    def cluster_borders(self, cx, cy):
+        """
+        @return: the borders (cx, cy, axis) that touch the cluster (cx, cy), its four sides and its
+                 four corners
+        """
+        return ((cx - 1, cy, 0), (cx, cy, 0), (cx, cy - 1, 1), (cx, cy, 1),
+                (cx - 1, cy - 1, 2), (cx, cy - 1, 2), (cx - 1, cy, 2), (cx, cy, 2))
+
+    def border_clusters(self, cx, cy, axis):
+        """
+        @return: the clusters that share the border (cx, cy, axis), axis 0 is the border to the
+                 cluster in positive x direction, axis 1 to the cluster in positive y direction and
+                 axis 2 the corner to the cluster in positive x and y direction
+        """
+        if axis == 2:
+            return ((cx, cy), (cx + 1, cy), (cx, cy + 1), (cx + 1, cy + 1))
+        return ((cx, cy), (cx + 1, cy) if axis == 0 else (cx, cy + 1))
+
+    def update_border(self, cx, cy, axis):
+        """
+        find the entrances along a border and replace its transitions and inter-edges
+
+        @return: False if the border does not exist
+        """
+        if cx < 0 or cy < 0 or (axis != 1 and cx + 1 >= self.clusters_x) or \
+           (axis != 0 and cy + 1 >= self.clusters_y) or cx >= self.clusters_x or cy >= self.clusters_y:
+            return False
+
+        if axis == 2:
+            transitions = self.corner_transitions(cx, cy)
+        else:
+            transitions = self.side_transitions(cx, cy, axis)
+
+        # replace the inter-edges of the old transitions
+        for node_a, node_b in self.transitions.get((cx, cy, axis), ()):
+            for node, other in ((node_a, node_b), (node_b, node_a)):
+                self.inter_edges[node].pop(other, None)
+                if not self.inter_edges[node]:
+                    del self.inter_edges[node]
+        for node_a, node_b in transitions:
+            (xa, ya), (xb, yb) = divmod(node_a, self.map_height), divmod(node_b, self.map_height)
+            step = sqrt(2) if xa != xb and ya != yb else 1.0
+            self.inter_edges.setdefault(node_a, {})[node_b] = step + self.cost[node_b] * self.cost_factor
+            self.inter_edges.setdefault(node_b, {})[node_a] = step + self.cost[node_a] * self.cost_factor
+        self.transitions[(cx, cy, axis)] = transitions
+        return True
+
+    def side_transitions(self, cx, cy, axis):
+        """
+        @return: the transitions (pairs of cell indices) across the side of the cluster (cx, cy) in
+                 positive x (axis 0) or y (axis 1) direction
+        """
+        size = self.cluster_size
+
+        # cells on both sides of the border
+        if axis == 0:
+            along = np.arange(cy * size, min((cy + 1) * size, self.map_height))
+            side_a = np.column_stack((np.full(len(along), (cx + 1) * size - 1), along))
+            side_b = side_a + (1, 0)
+        else:
+            along = np.arange(cx * size, min((cx + 1) * size, self.map_width))
+            side_a = np.column_stack((along, np.full(len(along), (cy + 1) * size - 1)))
+            side_b = side_a + (0, 1)
+        free_a = np.isfinite(self.enter_cost[side_a[:, 0], side_a[:, 1]])
+        free_b = np.isfinite(self.enter_cost[side_b[:, 0], side_b[:, 1]])
+        free = free_a & free_b
+
+        # maximal runs of free cells along the border (start inclusive, end exclusive)
+        edges = np.diff(np.concatenate(([0], free.astype(np.int8), [0])))
+        runs = zip(np.nonzero(edges == 1)[0], np.nonzero(edges == -1)[0])
+
+        # pairs of positions along the border (side a, side b) that are connected by a transition
+        pairs = []
+        for begin, end in runs:
+            if end - begin > self.max_entrance_width:
+                positions = (begin, end - 1)
+            else:
+                positions = ((begin + end - 1) // 2,)
+            pairs.extend((i, i) for i in positions)
+
+        # a diagonal step from side a at i to side b at i + 1 (or from i + 1 to i) can be replaced by
+        # an entrance at i or i + 1 unless both cells next to the step are blocked
+        squeezed = ~free[:-1] & ~free[1:]
+        pairs.extend((i, i + 1) for i in np.nonzero(squeezed & free_a[:-1] & free_b[1:])[0])
+        pairs.extend((i + 1, i) for i in np.nonzero(squeezed & free_a[1:] & free_b[:-1])[0])
+
+        return [(int(side_a[i, 0]) * self.map_height + int(side_a[i, 1]),
+                 int(side_b[j, 0]) * self.map_height + int(side_b[j, 1])) for i, j in pairs]
+
+    def corner_transitions(self, cx, cy):
+        """
+        @return: the transitions (pairs of cell indices) of the diagonal steps across the corner in
+                 positive x and y direction of the cluster (cx, cy) whose two neighbouring cells are
+                 both blocked, other diagonal steps can be replaced by steps across the sides
+        """
+        x, y = (cx + 1) * self.cluster_size, (cy + 1) * self.cluster_size
+        free = np.isfinite(self.enter_cost[x - 1:x + 1, y - 1:y + 1])
+
+        transitions = []
+        for (ax, ay), (bx, by) in (((0, 0), (1, 1)), ((1, 0), (0, 1))):
+            if free[ax, ay] and free[bx, by] and not free[ax, by] and not free[bx, ay]:
+                transitions.append(((x - 1 + ax) * self.map_height + y - 1 + ay,
+                                    (x - 1 + bx) * self.map_height + y - 1 + by))
+        return transitions
+
+    def cluster_nodes(self, cx, cy):
+        """
+        @return: sorted cell indices of the abstract nodes within the cluster (cx, cy)
+        """
+        nodes = set()
+        for border in self.cluster_borders(cx, cy):
+            for transition in self.transitions.get(border, ()):
+                nodes.update(node for node in transition if self.cluster_of(node) == (cx, cy))
+        return sorted(nodes)
+
+    def cluster_of(self, node):
+        """
+        @return: the cluster that contains the cell with index node
+        """
+        x, y = divmod(node, self.map_height)
+        return (x // self.cluster_size, y // self.cluster_size)
+
+    def cluster_distances(self, sources, reverse=False):
+        """
+        This function is used to compute the costs between cells within many clusters at once. For
+        every source, all cells of its cluster are relaxed with their 8 neighbours until the costs
+        do not change anymore, the search never leaves the cluster. Sources whose costs converged
+        are removed from the batch.
+
+        @parameter sources: list of source cells (x, y)
+        @parameter reverse: if True, the costs from every cell to the sources are computed
+        @return: array of shape (sources, cluster_size, cluster_size) with the costs, indexed by the
+                 position of the cell within the cluster of the source
+        """
+        size = self.cluster_size
+        cells = np.array(sources, dtype=np.int64).reshape(-1, 2)
+        enter = self.enter_cost.reshape(self.clusters_x, size, self.clusters_y, size).transpose(0, 2, 1, 3)
+        enter = enter[cells[:, 0] // size, cells[:, 1] // size]
+
+        dist = np.full((len(cells), size, size), inf)
+        dist[np.arange(len(cells)), cells[:, 0] % size, cells[:, 1] % size] = 0.0
+
+        # slices of the destination and of the source cells for every step
+        shifts = []
+        for offsetX, offsetY, step in self.steps:
+            dst = tuple(slice(max(o, 0), size + min(o, 0)) for o in (offsetX, offsetY))
+            src = tuple(slice(max(-o, 0), size + min(-o, 0)) for o in (offsetX, offsetY))
+            shifts.append((dst, src, step) if not reverse else (src, dst, step))
+
+        active = np.arange(len(cells))
+        while len(active):
+            batch, batch_enter = dist[active], enter[active]
+            previous = batch.copy()
+            for (dst_x, dst_y), (src_x, src_y), step in shifts:
+                view = batch[:, dst_x, dst_y]
+                if not reverse:
+                    np.minimum(view, batch[:, src_x, src_y] + step + batch_enter[:, dst_x, dst_y], out=view)
+                else:
+                    np.minimum(view, batch[:, src_x, src_y] + step + batch_enter[:, src_x, src_y], out=view)
+            dist[active] = batch
+            active = active[np.any(batch != previous, axis=(1, 2))]
+        return dist
+
+    def update_intra_edges(self, clusters):
+        """
+        compute the intra-edges between all abstract nodes of the clusters in one batched relaxation
+        """
+        self.rebuilt_clusters = len(clusters)
+        nodes = [self.cluster_nodes(cx, cy) for cx, cy in clusters]
+        sources = [divmod(node, self.map_height) for cluster in nodes for node in cluster]
+        dist = self.cluster_distances(sources) if sources else None
+        size = self.cluster_size
+
+        first = 0
+        for i, cluster in enumerate(clusters):
+            cells = sources[first:first + len(nodes[i])]
+            edges = {}
+            for j, node in enumerate(nodes[i]):
+                edges[node] = {}
+                for k, other in enumerate(nodes[i]):
+                    cost = dist[first + j, cells[k][0] % size, cells[k][1] % size]
+                    if j != k and cost < inf:
+                        edges[node][other] = float(cost)
+            self.intra_edges[cluster] = edges
+            first += len(nodes[i])
+
+    def blocked(self, node):
+        """
+        @return: True if the cell with index node cannot be entered
+        """
+        cost = self.cost[node]
+        return cost < 0 or cost >= self.lethal_cost
+
+    def heuristic(self, node, target):
+        """
+        @return: closed-form (octile) distance between the cell with index node and the cell target,
+                 a lower bound of the cost since every step costs at least its length
+        """
+        x, y = divmod(node, self.map_height)
+        dx = abs(x - target[0])
+        dy = abs(y - target[1])
+        return dx + dy + (sqrt(2) - 2) * min(dx, dy)
+
+    def nearest_free(self, position):
+        """
+        find the traversable cell that is closest to position, used if the robot is located in a
+        cell that cannot be entered (e.g. within the hard padding)
+
+        @return: the closest traversable cell or None if there is none
+        """
+        free = np.argwhere((self.map >= 0) & (self.map < self.lethal_cost))
+        if len(free) == 0:
+            return None
+        closest = free[np.argmin(np.sum((free - np.array(position)) ** 2, axis=1))]
+        return (int(closest[0]), int(closest[1]))
+
+    def abstract_search(self, start, end):
+        """
+        search the abstract graph, start and goal are connected to the nodes of their clusters
+
+        @return: cell indices of the nodes on the abstract path, empty if the goal cannot be reached
+        """
+        size = self.cluster_size
+        start_node = start[0] * self.map_height + start[1]
+        end_node = end[0] * self.map_height + end[1]
+        start_cluster = self.cluster_of(start_node)
+        end_cluster = self.cluster_of(end_node)
+
+        # costs from the start to the nodes of its cluster and from the nodes of the goal cluster to the goal
+        dist_start = self.cluster_distances([start])[0]
+        dist_end = self.cluster_distances([end], reverse=True)[0]
+        start_edges = {node: float(dist_start[x % size, y % size]) for node in self.intra_edges[start_cluster]
+                       for x, y in (divmod(node, self.map_height),)}
+        end_edges = {node: float(dist_end[x % size, y % size]) for node in self.intra_edges[end_cluster]
+                     for x, y in (divmod(node, self.map_height),)}
+        if start_cluster == end_cluster:
+            start_edges[end_node] = float(dist_start[end[0] % size, end[1] % size])
+
+        g = {start_node: 0.0}
+        parent = {start_node: -1}
+        closed = set()
+        open_list = [(self.heuristic(start_node, end), 0.0, start_node)]
+        while open_list:
+            _, node_g, node = heapq.heappop(open_list)
+            if node in closed or node_g > g[node]:
+                continue
+            closed.add(node)
+            self.expanded_nodes += 1
+
+            if node == end_node:
+                path = []
+                while node != -1:
+                    path.append(node)
+                    node = parent[node]
+                return path[::-1]
+
+            # the start is connected to the nodes of its cluster, it can be an abstract node itself
+            if node == start_node and len(closed) == 1:
+                neighbours = list(start_edges.items()) + list(self.inter_edges.get(node, {}).items())
+            else:
+                neighbours = list(self.intra_edges[self.cluster_of(node)].get(node, {}).items()) + \
+                    list(self.inter_edges.get(node, {}).items())
+                if node in end_edges:
+                    neighbours.append((end_node, end_edges[node]))
+
+            for other, cost in neighbours:
+                new_g = node_g + cost
+                if new_g < g.get(other, inf):
+                    g[other] = new_g
+                    parent[other] = node
+                    heapq.heappush(open_list, (new_g + self.heuristic(other, end), new_g, other))
+        return []
+
+    def refine(self, start, end, corridor):
+        """
+        A* on the cells of the clusters in corridor
+
+        @return: a path from start to goal, empty if the goal cannot be reached within the corridor
+        """
+        map_width, map_height, size = self.map_width, self.map_height, self.cluster_size
+        start_node = start[0] * map_height + start[1]
+        end_node = end[0] * map_height + end[1]
+
+        g = {start_node: 0.0}
+        parent = {start_node: -1}
+        closed = set()
+        open_list = [(self.heuristic(start_node, end), 0.0, start_node)]
+        while open_list:
+            _, node_g, minF = heapq.heappop(open_list)
+            if minF in closed or node_g > g[minF]:
+                continue
+            closed.add(minF)
+            self.expanded_nodes += 1
+
+            if minF == end_node:
+                path = []
+                while minF != -1:
+                    path.append(divmod(minF, map_height))
+                    minF = parent[minF]
+                return path[::-1]
+
+            x, y = divmod(minF, map_height)
+            for offsetX, offsetY, step in self.steps:
+                node_x = x + offsetX
+                node_y = y + offsetY
+
+                # if the offset is out of boundary or of the corridor
+                if node_x > map_width - 1 or node_x < 0 or node_y > map_height - 1 or node_y < 0 or \
+                   (node_x // size, node_y // size) not in corridor:
+                    continue
+
+                node = node_x * map_height + node_y
+                if node in closed or self.blocked(node):
+                    continue
+
+                new_g = node_g + step + self.cost[node] * self.cost_factor
+                if new_g < g.get(node, inf):
+                    g[node] = new_g
+                    parent[node] = minF
+                    heapq.heappush(open_list, (new_g + self.heuristic(node, end), new_g, node))
+        return []
+
+    def plan(self, start, end):
+        """
+        plan on the abstract graph of the last built costmap and refine the path in its corridor
+
+        @return: a global path, empty if the goal cannot be reached
+        """
+        self.expanded_nodes = 0
+
+        # Start the search from the closest traversable cell if the start cannot be entered
+        if self.blocked(start[0] * self.map_height + start[1]):
+            start = self.nearest_free(start)
+            if start is None:
+                return []
+        if self.blocked(end[0] * self.map_height + end[1]):
+            return []
+
+        abstract_path = self.abstract_search(start, end)
+        if not abstract_path:
+            return []
+
+        corridor = set(self.cluster_of(node) for node in abstract_path)
+        return self.refine(start, end, corridor)
+
+    def hpa(self, gridmap, map_width, map_height, start, end):
+        """
+        main function of hpa search, the abstract graph is only rebuilt where the costmap changed
+
+        @return: a global path, empty if the goal cannot be reached
+        """
+        self.build(gridmap)
+        return self.plan(start, end)
+
+class main():
+    """
+    implement of global planner, neccessary subscribers and publishers
+    """
+
+    def __init__(self):
+
+        # The abstract graph is built when a costmap arrives and used for all goals
+        self.hpa_planner = Hpa_Planner()
+        self.lock = Lock()
+
+        # Initialize Subscribers
+        rospy.wait_for_message('/global_costmap', OccupancyGrid)
+        self.sub_map = rospy.Subscriber('/global_costmap', OccupancyGrid, self.callback_costmap)
+        self.sub_pos = rospy.Subscriber('/pose', PoseStamped, self.callback_pos)
+        self.sub_goal = rospy.Subscriber('/move_base_simple/goal', PoseStamped, self.callback_goal)
+
+        # Initialize Publisher
+        self.pub_path = rospy.Publisher('/global_path', Path, queue_size=10)
+        self.pub_plan = rospy.Publisher('/visualization/plan', Marker, queue_size=10)
+
+        # Initialize messages
+        self.msg_path = Path()
+        self.msg_path.header.stamp = rospy.Time.now()
+        self.msg_path.header.frame_id = "path"
+
+        self.msg_path_marker = Marker()
+        self.msg_path_marker.header.frame_id = "map"
+        self.msg_path_marker.ns = "navigation"
+        self.msg_path_marker.id = 0
+        self.msg_path_marker.type = Marker.LINE_STRIP
+        self.msg_path_marker.action = Marker.ADD
+        self.msg_path_marker.scale.x = 0.1
+        self.msg_path_marker.color.a = 0.5
+        self.msg_path_marker.color.r = 0.0
+        self.msg_path_marker.color.g = 0.0
+        self.msg_path_marker.color.b = 1.0
+        self.msg_path_marker.pose.orientation = Quaternion(0, 0, 0, 1)
+
+    def callback_costmap(self, OccupancyGrid):
+        """
+        callback of costmap, rebuilds the abstract graph for the clusters that changed
+        """
+        self.map_input = np.array(OccupancyGrid.data)
+        self.map_width = OccupancyGrid.info.width
+        self.map_height = OccupancyGrid.info.height
+        self.map = self.map_input.reshape(self.map_height, self.map_width) # shape of 169(width)*116(height)
+        self.map = np.transpose(self.map)
+        self.origin = OccupancyGrid.info.origin.position
+        self.resolution = OccupancyGrid.info.resolution
+
+        self.lock.acquire()
+        self.hpa_planner.build(self.map)
+        self.lock.release()
+        rospy.loginfo('Abstract graph updated ({} clusters rebuilt)'.format(self.hpa_planner.rebuilt_clusters))
+
+    def callback_pos(self, PoseStamped):
+        """
+        callback of position
+        """
+        self.pos_x = int((PoseStamped.pose.position.x - self.origin.x) / self.resolution)
+        self.pos_y = int((PoseStamped.pose.position.y - self.origin.y) / self.resolution)
+
+    def callback_goal(self, PoseStamped):
+        """
+        callback of goal
+        """
+        # shift position to position in map
+        self.goal_x = int((PoseStamped.pose.position.x - self.origin.x) / self.resolution)
+        self.goal_y = int((PoseStamped.pose.position.y - self.origin.y) / self.resolution)
+
+    def check_valid(self, goalx, goaly):
+        """
+        check the validility of goal
+        """
+        if goalx > self.map_width - 1 or goalx < 0 or goaly > self.map_height - 1 or goaly < 0:
+            rospy.logwarn('Goal is out of boundary')
+            return None
+        elif self.map[int(goalx)][int(goaly)] < 90 and self.map[int(goalx)][int(goaly)] > -1:
+            return True
+        else:
+            return None
+
+    # run hpa node
+    def run(self, rate: float = 1):
+
+        while not rospy.is_shutdown():
+
+            # wait for goal input to start global planner
+            rospy.wait_for_message('/move_base_simple/goal', PoseStamped)
+
+            # initialize start node
+            start = (self.pos_x, self.pos_y)
+
+            if self.check_valid(self.goal_x, self.goal_y):
+
+                end = (int(self.goal_x), int(self.goal_y))
+                self.lock.acquire()
+                path = self.hpa_planner.plan(start, end)
+                self.lock.release()
+                if not path:
+                    rospy.loginfo('Goal cannot be reached')
+                    continue
+
+                # publish path and visulized plan
+                for pa in path:
+                    pose = PoseStamped()
+                    pose.pose.position.x = (pa[0] + 0.5) * self.resolution + self.origin.x
+                    pose.pose.position.y = (pa[1] + 0.5) * self.resolution + self.origin.y
+                    self.msg_path_marker.points.append(Point(pose.pose.position.x, pose.pose.position.y, 0))
+                    self.msg_path.poses.append(pose)
+                self.pub_plan.publish(self.msg_path_marker)
+                self.pub_path.publish(self.msg_path)
+                self.msg_path.poses.clear()
+                self.msg_path_marker.points.clear()
+                rospy.loginfo('Path is published ({} nodes expanded)'.format(self.hpa_planner.expanded_nodes))
+
+            else:
+                rospy.loginfo('Goal is not valid')
+
+
+
+if __name__ == "__main__":
+   rospy.init_node('rto_global_planner')
+
+   main = main()
+   main.run(rate=1)
\ No newline at end of file
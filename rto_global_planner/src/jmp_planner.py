@@ -2,163 +2,274 @@
 
 import rospy
 import numpy as np
+import heapq
 import tf
 
+from math import sqrt, inf
+
 from std_msgs.msg import String
 from geometry_msgs.msg import Twist, Point, Quaternion, Pose, PoseStamped, PoseWithCovarianceStamped
 from sensor_msgs.msg import LaserScan
 from nav_msgs.msg import OccupancyGrid, MapMetaData, Path
 from visualization_msgs.msg import Marker
 
-class Node():
+def sign(value):
     """
-    A node class for Pathfinding
-    @parameter parent: parent node
-    @parameter position: position on map
-    @parameter g: cost from start position to current position
-    @parameter h: heuristic cost from current position to goal
-    @parameter f: sum of g and h
+    @return: sign of value as an integer (-1, 0 or 1)
     """
-
-    def __init__(self, parent=None, position=None):
-        self.parent = parent
-        self.position = position
-
-        self.g = 0
-        self.h = 0
-        self.f = 0
-
-    def __eq__(self, other):
-        return self.position == other.position
+    return (value > 0) - (value < 0)
 
 class Jps_Planner():
     """
     Independent Jps_Planner function class
+
+    Jump point search on the padded costmap. Cells with cost 0 form the uniform-cost part of the
+    map, in which straight and diagonal runs are skipped by jumping until a forced neighbour, the
+    goal or a soft padded cell is found. Soft padded cells (0 < cost < lethal_cost) become jump
+    points themselves and are expanded like in a regular 8-connected A*, while hard padded,
+    occupied and unknown cells are not traversable.
+    @parameter expanded_nodes: number of jump points expanded by the last search
     """
 
-    def getMinNode(self):
-        """
-        try to find the node with minimal f in openlist
+    # Costmap values from which on a cell is not traversable
+    lethal_cost = 100
 
-        @return: the node with minimal f value
-        """
-        currentNode = self.open_list[0]
-        for node in self.open_list:
-            # if node.g + node.h < currentNode.g + currentNode.h:
-            if node.f < currentNode.f:
-                currentNode = node
-        return currentNode
+    # Weight of the costmap value of a soft padded cell that is added to the cost to enter it
+    cost_factor = 0.5
+
+    # 8-connected neighbourhood
+    directions = ((0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+    def __init__(self):
+        self.expanded_nodes = 0
 
-    def pointInCloseList(self, position):
+    def blocked(self, x, y):
         """
-        determine if a position is in closelist
+        @return: True if the cell (x, y) is out of boundary or not traversable
         """
-        for node in self.closed_list:
-            if node.position == position:
-                return True
-        return False
+        if x > self.map_width - 1 or x < 0 or y > self.map_height - 1 or y < 0:
+            return True
+        cost = self.cost[x * self.map_height + y]
+        return cost < 0 or cost >= self.lethal_cost
 
-    def pointInOpenList(self, position):
+    def nonuniform(self, x, y):
         """
-        determine if a position is in openlist
+        @return: True if the cell (x, y) is not part of the uniform-cost space (blocked or soft padded)
         """
-        for node in self.open_list:
-            if node.position == position:
-                return node
-        return None
+        return self.blocked(x, y) or self.cost[x * self.map_height + y] > 0
 
-    def endPointInCloseList(self):
+    def soft(self, x, y):
         """
-        determine if goal is already in closelist
+        @return: True if the cell (x, y) is soft padded, has to be checked to be not blocked before
         """
-        for node in self.closed_list:
-            if node.position == self.endnode.position:
-                return node
-        return None
+        return self.cost[x * self.map_height + y] > 0
 
-    def getg(self, node):
+    def getg(self, parent, position):
         """
-        @return: g value of node
+        @return: g value of position when it is reached in a straight line from parent
         """
-        dx = abs(node.parent.position[0] - node.position[0])
-        dy = abs(node.parent.position[0] - node.position[0])
-        return node.parent.g + np.sqrt(dx * dx + dy * dy)
+        dx = abs(parent[0] - position[0])
+        dy = abs(parent[1] - position[1])
+        return self.g[parent[0] * self.map_height + parent[1]] + sqrt(dx * dx + dy * dy) + \
+            self.cost[position[0] * self.map_height + position[1]] * self.cost_factor
 
-    def geth(self, node):
+    def geth(self, position):
         """
-        @return: h value of node
+        @return: h value of position
         """
-        dx = abs(node.position[0] - self.endnode.position[0])
-        dy = abs(node.position[1] - self.endnode.position[1])
-        # closed-form distance
-        # node.h =  dx + dy + (np.sqrt(2) - 2) * min(dx, dy) + self.map[node.position[0]][node.position[1]] * 0.5
-        # euclidean distance
-        node.h =  dx + dy + self.map[node.position[0]][node.position[1]] * 0.5
-        # real distance
-        # node.h =  np.sqrt(dx * dx + dy * dy) + self.map[node.position[0]][node.position[1]] * 0.5
-        return node.h
+        dx = abs(position[0] - self.end[0])
+        dy = abs(position[1] - self.end[1])
+        # closed-form (octile) distance, admissible since every step costs at least its length
+        return dx + dy + (sqrt(2) - 2) * min(dx, dy)
 
-    def diagonal(self, node, direction):
+    def diagonal(self, position, direction):
         """
-        docstring
+        jump from position in a diagonal direction
+
+        @return: the next jump point in this direction or None
         """
-        pass
+        x, y = position
+        dx, dy = direction
+        while True:
+            x += dx
+            y += dy
+            if self.blocked(x, y):
+                return None
+            if (x, y) == self.end or self.soft(x, y):
+                return (x, y)
+
+            # forced neighbours
+            if (self.nonuniform(x - dx, y) and not self.blocked(x - dx, y + dy)) or \
+               (self.nonuniform(x, y - dy) and not self.blocked(x + dx, y - dy)):
+                return (x, y)
+
+            # the cell is a jump point if a jump point can be reached by a cardinal jump from it
+            if self.cardinal((x, y), (dx, 0)) or self.cardinal((x, y), (0, dy)):
+                return (x, y)
+
+    def cardinal(self, position, direction):
+        """
+        jump from position in a horizontal or vertical direction
 
-    def cardinal(self, node, direction):
+        @return: the next jump point in this direction or None
         """
-        docstring
+        x, y = position
+        dx, dy = direction
+        while True:
+            x += dx
+            y += dy
+            if self.blocked(x, y):
+                return None
+            if (x, y) == self.end or self.soft(x, y):
+                return (x, y)
+
+            # forced neighbours
+            if dx != 0:
+                if (self.nonuniform(x, y + 1) and not self.blocked(x + dx, y + 1)) or \
+                   (self.nonuniform(x, y - 1) and not self.blocked(x + dx, y - 1)):
+                    return (x, y)
+            else:
+                if (self.nonuniform(x + 1, y) and not self.blocked(x + 1, y + dy)) or \
+                   (self.nonuniform(x - 1, y) and not self.blocked(x - 1, y + dy)):
+                    return (x, y)
+
+    def prune(self, position, parent):
         """
-        pass
+        @return: directions of the natural and forced neighbours of position when it is reached
+                 from parent
+        """
+        x, y = position
+        dx = sign(x - parent[0])
+        dy = sign(y - parent[1])
+
+        if dx != 0 and dy != 0:
+            directions = [(dx, 0), (0, dy), (dx, dy)]
+            if self.nonuniform(x - dx, y):
+                directions.append((-dx, dy))
+            if self.nonuniform(x, y - dy):
+                directions.append((dx, -dy))
+        elif dx != 0:
+            directions = [(dx, 0)]
+            if self.nonuniform(x, y + 1):
+                directions.append((dx, 1))
+            if self.nonuniform(x, y - 1):
+                directions.append((dx, -1))
+        else:
+            directions = [(0, dy)]
+            if self.nonuniform(x + 1, y):
+                directions.append((1, dy))
+            if self.nonuniform(x - 1, y):
+                directions.append((-1, dy))
+        return directions
+
+    def add_node(self, minF, position):
+        """
+        add position with parent minF to openlist if this improves its g value
+        """
+        node = position[0] * self.map_height + position[1]
+        if self.closed[node]:
+            return
+        g = self.getg(minF, position)
+        if g < self.g[node]:
+            self.g[node] = g
+            self.parent[node] = minF
+            heapq.heappush(self.open_list, (g + self.geth(position), g, position))
 
     def extend_node(self, minF):
         """
         search action for next step and add this node to openlist
         """
-        pass
+        node = minF[0] * self.map_height + minF[1]
+        parent = self.parent[node]
+
+        # soft padded cells are expanded like in a regular A*
+        if self.soft(minF[0], minF[1]):
+            for dx, dy in self.directions:
+                if not self.blocked(minF[0] + dx, minF[1] + dy):
+                    self.add_node(minF, (minF[0] + dx, minF[1] + dy))
+            return
+
+        # the pruning rules only hold if the parent was reached by a jump as well
+        if parent is None or self.soft(parent[0], parent[1]):
+            directions = self.directions
+        else:
+            directions = self.prune(minF, parent)
+
+        for direction in directions:
+            if direction[0] != 0 and direction[1] != 0:
+                jump_point = self.diagonal(minF, direction)
+            else:
+                jump_point = self.cardinal(minF, direction)
+            if jump_point:
+                self.add_node(minF, jump_point)
+
+    def get_path(self, end):
+        """
+        @return: cell path from start to end, obtained by filling the straight lines between the jump points
+        """
+        jump_points = []
+        current = end
+        while current is not None:
+            jump_points.append(current)
+            current = self.parent[current[0] * self.map_height + current[1]]
+        jump_points = jump_points[::-1]
+
+        path = [jump_points[0]]
+        for position in jump_points[1:]:
+            x, y = path[-1]
+            dx = sign(position[0] - x)
+            dy = sign(position[1] - y)
+            while (x, y) != position:
+                x += dx
+                y += dy
+                path.append((x, y))
+        return path
 
     def jps(self, gridmap, map_width, map_height, start, end):
         """
-        main function of astar search
+        main function of jump point search
 
-        @return: a global path
+        @return: a global path, empty if the goal cannot be reached
         """
 
-        # Initialize endnode and startnode
-        self.startnode = Node(None, start)
-        self.startnode.g = self.startnode.h = self.startnode.f = 0
-        self.endnode = Node(None, end)
-        self.endnode.g = self.endnode.h = self.endnode.f = 0
-        self.map = gridmap
+        # Initialize map and endpoints
+        self.cost = np.asarray(gridmap).ravel().tolist()
         self.map_width = map_width
         self.map_height = map_height
+        self.end = end
+
+        # Initialize cell-indexed g values, parents and closed set
+        n_cells = map_width * map_height
+        self.g = [inf] * n_cells
+        self.parent = [None] * n_cells
+        self.closed = bytearray(n_cells)
+        self.g[start[0] * map_height + start[1]] = 0
 
-        # Initialize open and closed list
-        self.open_list = [self.startnode] # store f of next possible step
-        self.closed_list = [] # store f of minimal path
+        # Initialize open list (binary heap with lazy decrease-key)
+        self.open_list = [(self.geth(start), 0, start)]
+        self.expanded_nodes = 0
 
         # try to find the path with minimal cost
-        while True:
+        while self.open_list:
+
+            # find the node with minimal f in openlist, skip outdated entries
+            _, g, minF = heapq.heappop(self.open_list)
+            node = minF[0] * map_height + minF[1]
+            if self.closed[node] or g > self.g[node]:
+                continue
 
-            # find the node with minimal f in openlist
-            minF = self.getMinNode()
+            # add this node to closed list
+            self.closed[node] = 1
+            self.expanded_nodes += 1
 
-            # add this node to closed_list and delete this node from open_list
-            self.closed_list.append(minF)
-            self.open_list.remove(minF)
+            # determine if it the endpoint, if it is endnode, then return a path
+            if minF == end:
+                return self.get_path(end)
 
-            # apply search to add node for next step
+            # apply search to add jump points for next step
             self.extend_node(minF)
 
-            # determine if it the endpoint
-            endnode = self.endPointInCloseList()
-            # if it is endnode, then return a path
-            if endnode:
-                path = []
-                current = endnode
-                while current is not None:
-                    path.append(current.position)
-                    current = current.parent
-                return path[::-1]
+        return []
 
 class main():
     """
@@ -168,9 +279,10 @@ class main():
     def __init__(self):
 
         # Initialize Subscribers
-        # self.sub_pos = rospy.Subscriber('/amcl_pose', PoseWithCovarianceStamped, self.callback_pos)
+        rospy.wait_for_message('/global_costmap', OccupancyGrid)
         # self.sub_map = rospy.Subscriber('/move_base/global_costmap/costmap', OccupancyGrid, self.callback_costmap)
         self.sub_map = rospy.Subscriber('/global_costmap', OccupancyGrid, self.callback_costmap)
+        self.sub_pos = rospy.Subscriber('/pose', PoseStamped, self.callback_pos)
         self.sub_goal = rospy.Subscriber('/move_base_simple/goal', PoseStamped, self.callback_goal)
 
         # Initialize Publisher
@@ -196,15 +308,6 @@ class main():
         self.msg_path_marker.color.b = 1.0
         self.msg_path_marker.pose.orientation = Quaternion(0, 0, 0, 1)
 
-    # Wait for amcl part to provide it with initial position
-    # def callback_pos(self, PoseWithCovarianceStamped):
-    #     """
-    #     callback of position
-    #     """
-    #     self.pos_x = int((PoseWithCovarianceStamped.pose.pose.position.x + 3.246519) / 0.05)
-    #     self.pos_y = int((PoseWithCovarianceStamped.pose.pose.position.y + 3.028618) / 0.05)
-    #     print(PoseWithCovarianceStamped.pose.pose.position)
-
     def callback_costmap(self, OccupancyGrid):
         """
         callback of costmap
@@ -215,14 +318,22 @@ class main():
         self.map = self.map_input.reshape(self.map_height, self.map_width) # shape of 169(width)*116(height)
         self.map = np.transpose(self.map)
         self.origin = OccupancyGrid.info.origin.position
+        self.resolution = OccupancyGrid.info.resolution
+
+    def callback_pos(self, PoseStamped):
+        """
+        callback of position
+        """
+        self.pos_x = int((PoseStamped.pose.position.x - self.origin.x) / self.resolution)
+        self.pos_y = int((PoseStamped.pose.position.y - self.origin.y) / self.resolution)
 
     def callback_goal(self, PoseStamped):
         """
         callback of goal
         """
         # shift position to position in map
-        self.goal_x = int((PoseStamped.pose.position.x - self.origin.x) / 0.05)
-        self.goal_y = int((PoseStamped.pose.position.y - self.origin.y) / 0.05)
+        self.goal_x = int((PoseStamped.pose.position.x - self.origin.x) / self.resolution)
+        self.goal_y = int((PoseStamped.pose.position.y - self.origin.y) / self.resolution)
 
     def check_valid(self, goalx, goaly):
         """
@@ -231,7 +342,7 @@ class main():
         if goalx > self.map_width - 1 or goalx < 0 or goaly > self.map_height - 1 or goaly < 0:
             rospy.logwarn('Goal is out of boundary')
             return None
-        elif self.map[int(goalx)][int(goaly)] < 90:
+        elif self.map[int(goalx)][int(goaly)] < 90 and self.map[int(goalx)][int(goaly)] > -1:
             return True
         else:
             return None
@@ -246,31 +357,28 @@ class main():
             jps_planner = Jps_Planner()
 
             # initialize start node
-            #TODO:replace initial position using amcl
-            self.pos_x = int((0.09035 - self.origin.x) / 0.05)
-            self.pos_y = int((0.01150 - self.origin.y) / 0.05)
             start = (self.pos_x, self.pos_y)
 
             if self.check_valid(self.goal_x, self.goal_y):
 
                 end = (int(self.goal_x), int(self.goal_y))
                 path = jps_planner.jps(self.map, self.map_width, self.map_height, start, end)
+                if not path:
+                    rospy.loginfo('Goal cannot be reached')
+                    continue
 
-                # publish path
+                # publish path and visulized plan
                 for pa in path:
                     pose = PoseStamped()
-                    pose.pose.position.x = pa[0]
-                    pose.pose.position.y = pa[1]
+                    pose.pose.position.x = (pa[0] + 0.5) * self.resolution + self.origin.x
+                    pose.pose.position.y = (pa[1] + 0.5) * self.resolution + self.origin.y
+                    self.msg_path_marker.points.append(Point(pose.pose.position.x, pose.pose.position.y, 0))
                     self.msg_path.poses.append(pose)
+                self.pub_plan.publish(self.msg_path_marker)
                 self.pub_path.publish(self.msg_path)
                 self.msg_path.poses.clear()
-                rospy.loginfo('Path is published')
-
-                # publish plan
-                for p in path:
-                    self.msg_path_marker.points.append(Point(p[0]*0.05 + self.origin.x, p[1]*0.05 + self.origin.y, 0))
-                self.pub_plan.publish(self.msg_path_marker)
                 self.msg_path_marker.points.clear()
+                rospy.loginfo('Path is published ({} jump points expanded)'.format(jps_planner.expanded_nodes))
 
             else:
                 rospy.loginfo('Goal is not valid')
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+
+"""
+Plan cache of the global planners.
+
+The robot shuttles between the same bins, docks and drop-off points, so the same goals are
+requested again and again. Paths are cached in a bounded LRU keyed by (quantized start cell, goal
+cell, costmap hash). A cached path is reused if the new start lies on or near it (within
+reuse_distance cells and with a free line of sight to it), in which case the remaining part of
+the path is returned. All entries are invalidated when a changed costmap is received. The costmap
+is set from the subscriber thread while the main loop looks up paths, so all methods that access
+the entries hold a lock.
+"""
+
+import hashlib
+import time
+
+import numpy as np
+
+from collections import OrderedDict
+from threading import Lock
+
+
+class Plan_Cache():
+    """
+    Bounded LRU cache of global paths
+
+    @parameter hits: number of lookups that returned a cached path
+    @parameter misses: number of lookups that did not return a cached path
+    @parameter invalidations: number of times the cache was cleared because the costmap changed
+    """
+
+    # Costmap values from which on a cell blocks the line of sight to a cached path
+    lethal_cost = 100
+
+    def __init__(self, max_entries=32, start_quantization=4, reuse_distance=4):
+        """
+        @parameter max_entries: maximal number of cached paths
+        @parameter start_quantization: side length of the square of cells that share a start key
+        @parameter reuse_distance: maximal distance (cells) of the start to a cached path to reuse it
+        """
+        self.max_entries = max_entries
+        self.start_quantization = start_quantization
+        self.reuse_distance = reuse_distance
+
+        self.lock = Lock()
+        self.entries = OrderedDict()
+        self.map = None
+        self.costmap_hash = None
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.hit_time = 0.0
+        self.miss_time = 0.0
+
+    def set_costmap(self, gridmap):
+        """
+        set the costmap the cached paths are planned on, invalidates all entries if it changed
+
+        @parameter gridmap: costmap indexed by [x][y]
+        """
+        gridmap = np.ascontiguousarray(gridmap)
+        costmap_hash = hashlib.sha1(gridmap.tobytes() + repr((gridmap.shape, gridmap.dtype.str)).encode()).hexdigest()
+        with self.lock:
+            if costmap_hash != self.costmap_hash and self.entries:
+                self.entries.clear()
+                self.invalidations += 1
+            self.map = gridmap
+            self.costmap_hash = costmap_hash
+
+    def key(self, start, end):
+        """
+        @return: key of the cache entry of a start/goal pair on the current costmap
+        """
+        q = self.start_quantization
+        return (start[0] // q, start[1] // q, end[0], end[1], self.costmap_hash)
+
+    def get(self, start, end):
+        """
+        look up a path from start to end. The entry of the quantized start is tried first, then all
+        other entries with the same goal.
+
+        @return: path from start to end or None if no cached path can be reused
+        """
+        time_start = time.perf_counter()
+        with self.lock:
+            key = self.key(start, end)
+            candidates = [key] if key in self.entries else []
+            candidates += [other for other in reversed(self.entries)
+                           if other != key and other[2:] == key[2:]]
+
+            for candidate in candidates:
+                path = self.reuse(self.entries[candidate], start)
+                if path is not None:
+                    self.entries.move_to_end(candidate)
+                    self.hits += 1
+                    self.hit_time += time.perf_counter() - time_start
+                    return path
+
+            self.misses += 1
+            return None
+
+    def put(self, start, end, path, planning_time=0.0):
+        """
+        add a path that was planned after a miss
+
+        @parameter planning_time: time in s it took to plan the path, reported as miss latency
+        """
+        with self.lock:
+            self.miss_time += planning_time
+            if not path:
+                return
+            self.entries[self.key(start, end)] = np.asarray(path, dtype=np.int64)
+            self.entries.move_to_end(self.key(start, end))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def reuse(self, path, start):
+        """
+        @return: the part of path after the farthest path cell within reuse_distance of start that
+                 can be seen from start, preceded by the cells on the line from start to it, or None
+                 if start is too far away from the path
+        """
+        start = np.asarray(start)
+        distances = np.max(np.abs(path - start), axis=1)
+        near = np.nonzero(distances <= self.reuse_distance)[0]
+
+        # prefer the cell farthest along the path, fall back to the closest one
+        for index in (near[-1], near[np.argmin(distances[near])]) if len(near) else ():
+            # cells on the line from start to the path cell (the path cell itself excluded)
+            steps = int(distances[index])
+            ratio = np.arange(steps) / max(steps, 1)
+            line = np.rint(start + ratio[:, np.newaxis] * (path[index] - start)).astype(np.int64)
+            if self.map is not None and len(line):
+                cost = self.map[line[:, 0], line[:, 1]]
+                if np.any((cost < 0) | (cost >= self.lethal_cost)):
+                    continue
+            return [tuple(cell) for cell in np.concatenate((line, path[index:])).tolist()]
+        return None
+
+    def report(self):
+        """
+        @return: summary of hit rate and latency of the cache
+        """
+        lookups = self.hits + self.misses
+        return 'Plan cache: {}/{} hits ({:.0f}%), hit latency {:.2f}ms, miss latency {:.2f}ms, {} invalidations'.format(
+            self.hits, lookups, 100.0 * self.hits / max(lookups, 1), 1000 * self.hit_time / max(self.hits, 1),
+            1000 * self.miss_time / max(self.misses, 1), self.invalidations)
\ No newline at end of file